@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Пакетный экспорт расписаний многих пользователей в ICS на всех ядрах
+
+Примеры:
+    python3 batch_export.py users/
+    python3 batch_export.py 'users/*/schedule.yaml' --output-dir calendars/ --workers 8
+"""
+
+import argparse
+import glob
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from export_ics import NotAScheduleError, export_file
+
+def collect_schedule_files(sources):
+    """Раскрывает каталоги и glob-шаблоны в отсортированный список YAML файлов"""
+    files = set()
+    for source in sources:
+        if os.path.isdir(source):
+            for pattern in ('*.yaml', '*.yml'):
+                files.update(glob.glob(os.path.join(source, '**', pattern), recursive=True))
+        else:
+            files.update(glob.glob(source, recursive=True))
+    return sorted(path for path in files if os.path.isfile(path))
+
+def source_root(files):
+    """Общий каталог всех файлов пакета — от него строятся пути внутри output_dir"""
+    return os.path.commonpath([os.path.dirname(os.path.abspath(path)) for path in files])
+
+def output_path_for(schedule_path, output_dir, root=None):
+    """.ics рядом с YAML или в output_dir по пути относительно root.
+
+    users/alice/schedule.yaml и users/bob/schedule.yaml при root=users дают
+    calendars/alice/schedule.ics и calendars/bob/schedule.ics, а не один файл.
+    """
+    if not output_dir:
+        return os.path.splitext(schedule_path)[0] + '.ics'
+    if root is None:
+        root = os.path.dirname(os.path.abspath(schedule_path))
+    relative = os.path.relpath(os.path.abspath(schedule_path), root)
+    return os.path.join(output_dir, os.path.splitext(relative)[0] + '.ics')
+
+def plan_outputs(files, output_dir=None):
+    """Пути .ics для files; ValueError, если два расписания попадают в один .ics"""
+    root = source_root(files) if output_dir and files else None
+    outputs = []
+    owners = {}
+    for path in files:
+        ics_path = output_path_for(path, output_dir, root)
+        key = os.path.normcase(os.path.abspath(ics_path))
+        if key in owners:
+            raise ValueError(f"{owners[key]} и {path} экспортируются в один файл {ics_path}")
+        owners[key] = path
+        outputs.append(ics_path)
+    return outputs
+
+def export_one(job):
+    """Задача воркера: никогда не бросает исключений, ошибка возвращается в результате.
+
+    Для YAML, который не является расписанием (program.yaml и т.п.), stats и
+    error равны None, а skipped содержит причину пропуска.
+    """
+    schedule_path, ics_path, full, use_cache, compress = job
+    started = time.perf_counter()
+    stats = error = skipped = None
+    try:
+        stats = export_file(schedule_path, ics_path, full=full, use_cache=use_cache, compress=compress)
+    except NotAScheduleError as exc:
+        skipped = str(exc)
+    except Exception as exc:  # noqa: BLE001 — одна битая схема не должна ронять пакет
+        error = f"{type(exc).__name__}: {' '.join(str(exc).split())}"
+    return schedule_path, ics_path, stats, error, skipped, time.perf_counter() - started
+
+def run_batch(files, output_dir=None, workers=None, full=False, use_cache=True, compress=False,
+              verbose=False):
+    """Экспортирует files параллельно и возвращает сводку по пакету.
+
+    ValueError (до запуска пула), если два расписания попадают в один .ics.
+    """
+    outputs = plan_outputs(files, output_dir)
+    for directory in {os.path.dirname(ics_path) for ics_path in outputs}:
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    jobs = [(path, ics_path, full, use_cache, compress) for path, ics_path in zip(files, outputs)]
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, len(jobs) // (workers * 4))
+
+    summary = {'files': len(jobs), 'ok': 0, 'failed': 0, 'skipped': 0, 'events': 0, 'rebuilt': 0,
+               'errors': []}
+    started = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for schedule_path, ics_path, stats, error, skipped, elapsed in pool.map(export_one, jobs,
+                                                                                   chunksize=chunksize):
+            if skipped:
+                summary['skipped'] += 1
+                if verbose:
+                    print(f"⏭  {skipped}")
+                continue
+            if error:
+                summary['failed'] += 1
+                summary['errors'].append((schedule_path, error))
+                print(f"❌ {schedule_path}: {error}")
+                continue
+
+            summary['ok'] += 1
+            summary['events'] += stats['events']
+            summary['rebuilt'] += stats.get('rebuilt', stats['events'])
+            if verbose:
+                print(f"✅ {schedule_path} -> {ics_path}: {stats['events']} событий "
+                      f"(пересобрано {stats.get('rebuilt', stats['events'])}) за {elapsed * 1000:.1f} мс")
+
+    summary['elapsed'] = time.perf_counter() - started
+    summary['workers'] = workers
+    return summary
+
+def print_summary(summary):
+    elapsed = summary['elapsed'] or 1e-9
+    print(f"\n📦 Расписаний: {summary['files']} (успешно {summary['ok']}, с ошибками {summary['failed']}, "
+          f"пропущено не-расписаний {summary['skipped']})")
+    print(f"📅 Событий: {summary['events']} (пересобрано {summary['rebuilt']})")
+    print(f"⏱  {elapsed:.2f} с на {summary['workers']} процессах: "
+          f"{summary['files'] / elapsed:.1f} расписаний/с, {summary['events'] / elapsed:.0f} событий/с")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Пакетный экспорт расписаний в ICS")
+    parser.add_argument('sources', nargs='+', help="каталоги или glob-шаблоны с YAML расписаниями")
+    parser.add_argument('-o', '--output-dir',
+                        help="каталог для .ics с подкаталогами как у исходников (по умолчанию — рядом с YAML)")
+    parser.add_argument('-j', '--workers', type=int, help="число процессов (по умолчанию — число ядер)")
+    parser.add_argument('--full', action='store_true', help="игнорировать манифесты и пересобрать все события")
+    parser.add_argument('--compress', action='store_true', help="сворачивать еженедельные повторы в RRULE-события")
+    parser.add_argument('--no-cache', action='store_true', help="не использовать снимки разобранного YAML")
+    parser.add_argument('-v', '--verbose', action='store_true', help="печатать результат по каждому файлу")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    files = collect_schedule_files(args.sources)
+    if not files:
+        print("❌ Файлы расписаний не найдены")
+        return 1
+
+    print(f"📤 Пакетный экспорт {len(files)} расписаний...")
+    try:
+        summary = run_batch(files, args.output_dir, args.workers, full=args.full,
+                            use_cache=not args.no_cache, compress=args.compress, verbose=args.verbose)
+    except ValueError as exc:
+        print(f"❌ {exc}")
+        return 1
+    print_summary(summary)
+    return 1 if summary['failed'] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
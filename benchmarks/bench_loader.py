@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк загрузки расписания: чистый Python, libyaml и кэшированный снимок
+
+Запуск из корня репозитория:
+    python3 benchmarks/bench_loader.py
+    python3 benchmarks/bench_loader.py --weeks 8 52 520 --repeat 5
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import yaml
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import write_schedule  # noqa: E402
+from schedule_loader import FastLoader, load_yaml, snapshot_path_for  # noqa: E402
+
+def best_of(repeat, func):
+    """Минимальное время из repeat запусков, в миллисекундах"""
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+def pure_python_load(path):
+    with open(path, 'rb') as f:
+        return yaml.load(f, Loader=yaml.SafeLoader)
+
+def cold_load(path):
+    snapshot = snapshot_path_for(path, 'snapshot')
+    if os.path.exists(snapshot):
+        os.remove(snapshot)
+    return load_yaml(path)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Бенчмарк загрузки расписания")
+    parser.add_argument('--weeks', type=int, nargs='+', default=[1, 8, 52, 260])
+    parser.add_argument('--slots-per-day', type=int, default=4)
+    parser.add_argument('--repeat', type=int, default=3)
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    print(f"🔧 Загрузчик YAML: {FastLoader.__name__}")
+    print(f"{'недель':>7} {'слотов':>8} {'SafeLoader':>12} {'C loader':>10} {'cold':>10} {'warm':>10}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for weeks in args.weeks:
+            path = os.path.join(tmp, f"schedule-{weeks}w.yaml")
+            slots = write_schedule(path, weeks, args.slots_per_day)
+
+            pure_ms = best_of(args.repeat, lambda: pure_python_load(path))
+            c_ms = best_of(args.repeat, lambda: load_yaml(path, use_cache=False))
+            cold_ms = best_of(args.repeat, lambda: cold_load(path))
+            warm_ms = best_of(args.repeat, lambda: load_yaml(path))
+
+            print(f"{weeks:>7} {slots:>8} {pure_ms:>10.2f}ms {c_ms:>8.2f}ms {cold_ms:>8.2f}ms {warm_ms:>8.2f}ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк конвейера экспорта: загрузка, цикл по слотам, создание событий, to_ical
+
+Для каждой комбинации (недель × слотов в день) генерируется синтетическое
+расписание, замеряется время этапов (profiling.StageTimer) и пик памяти
+(tracemalloc) для полного и потокового экспорта. Результат пишется в JSON,
+чтобы сравнивать версии между собой.
+
+Запуск из корня репозитория:
+    python3 benchmarks/bench_pipeline.py
+    python3 benchmarks/bench_pipeline.py --weeks 1 52 520 --slots-per-day 4 40 --max-slots 200000
+    python3 benchmarks/bench_pipeline.py --compare benchmarks/results/old.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import yaml
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import icalendar  # noqa: E402
+
+from benchmarks.synthetic import write_schedule  # noqa: E402
+from export_ics import (  # noqa: E402
+    calendar_header, open_multiweek_slots, write_ics_incremental,
+)
+from profiling import StageTimer  # noqa: E402
+from schedule_loader import FastLoader, load_yaml  # noqa: E402
+from schedule_model import build_schedule  # noqa: E402
+
+# Колонки таблицы; build_model есть только у полного (не потокового) экспорта
+STAGES = ('load_schedule', 'build_model', 'slot_loop', 'create_ics_event', 'to_ical', 'total')
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def time_stages(schedule_path, ics_path):
+    """Время этапов полного (не потокового) экспорта без кэшей"""
+    timer = StageTimer()
+    with timer.stage('total'):
+        with timer.stage('load_schedule'):
+            schedule = load_yaml(schedule_path, use_cache=False)
+        with timer.stage('build_model'):
+            model = build_schedule(schedule)
+        header = calendar_header(model.meta, model.timezone)
+        stats = write_ics_incremental(ics_path, model.iter_slots(), header, full=True, timer=timer)
+    return timer, stats['events']
+
+def peak_memory(func):
+    """Пик памяти Python-объектов за время func(), в байтах"""
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def full_export(schedule_path, ics_path):
+    model = build_schedule(load_yaml(schedule_path, use_cache=False))
+    write_ics_incremental(ics_path, model.iter_slots(), calendar_header(model.meta, model.timezone), full=True)
+
+def streaming_export(schedule_path, ics_path):
+    with open(schedule_path, 'rb') as src:
+        meta, tz, slots = open_multiweek_slots(src)
+        write_ics_incremental(ics_path, slots, calendar_header(meta, tz), full=True)
+
+def run_case(tmp, weeks, slots_per_day, with_memory):
+    schedule_path = os.path.join(tmp, f"schedule-{weeks}w-{slots_per_day}s.yaml")
+    ics_path = os.path.join(tmp, f"schedule-{weeks}w-{slots_per_day}s.ics")
+    slots = write_schedule(schedule_path, weeks, slots_per_day)
+
+    timer, events = time_stages(schedule_path, ics_path)
+    case = {
+        'weeks': weeks,
+        'slots_per_day': slots_per_day,
+        'slots': slots,
+        'yaml_bytes': os.path.getsize(schedule_path),
+        'ics_bytes': os.path.getsize(ics_path),
+        'stages': timer.report(),
+        'events_per_second': round(events / timer.totals['total'], 1),
+    }
+    if with_memory:
+        case['peak_bytes'] = peak_memory(lambda: full_export(schedule_path, ics_path))
+        case['stream_peak_bytes'] = peak_memory(lambda: streaming_export(schedule_path, ics_path))
+    return case
+
+def print_case(case):
+    stages = case['stages']
+    line = (f"{case['weeks']:>6} {case['slots_per_day']:>4} {case['slots']:>8}"
+            + ''.join(f" {stages.get(name, {}).get('seconds', 0) * 1000:>10.1f}"
+                      for name in STAGES)
+            + f" {case['events_per_second']:>9.0f}")
+    if 'peak_bytes' in case:
+        line += f" {case['peak_bytes'] / 2**20:>8.1f} {case['stream_peak_bytes'] / 2**20:>8.1f}"
+    print(line)
+
+def compare(previous_path, cases):
+    """Печатает отношение времени этапов к сохраненному результату (>1 — стало медленнее)"""
+    with open(previous_path, 'r', encoding='utf-8') as f:
+        previous = {(c['weeks'], c['slots_per_day']): c for c in json.load(f)['cases']}
+
+    print(f"\n📊 Сравнение с {previous_path} (новое / старое):")
+    for case in cases:
+        old = previous.get((case['weeks'], case['slots_per_day']))
+        if not old:
+            continue
+        ratios = []
+        for name, data in case['stages'].items():
+            old_seconds = old['stages'].get(name, {}).get('seconds')
+            if old_seconds:
+                ratios.append(f"{name}={data['seconds'] / old_seconds:.2f}x")
+        print(f"   {case['weeks']}w × {case['slots_per_day']}: {', '.join(ratios)}")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Бенчмарк конвейера экспорта в ICS")
+    parser.add_argument('--weeks', type=int, nargs='+', default=[1, 8, 52, 520])
+    parser.add_argument('--slots-per-day', type=int, nargs='+', default=[4, 40])
+    parser.add_argument('--max-slots', type=int, default=60000,
+                        help="пропускать комбинации с большим числом слотов (10 лет × 40/день — 150000)")
+    parser.add_argument('--no-memory', action='store_true', help="не замерять память (tracemalloc медленный)")
+    parser.add_argument('-o', '--output', help="JSON с результатами (по умолчанию benchmarks/results/<время>-<git>.json)")
+    parser.add_argument('--compare', help="JSON предыдущего запуска для сравнения")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    revision = git_revision()
+
+    print(f"🔧 Python {platform.python_version()}, YAML {FastLoader.__name__}, icalendar {icalendar.__version__}")
+    header = f"{'недель':>6} {'сл/д':>4} {'слотов':>8}" + ''.join(
+        f" {name:>10}" for name in ('load, мс', 'model, мс', 'slots, мс', 'event, мс', 'to_ical, мс', 'всего, мс'))
+    header += f" {'соб/с':>9}"
+    if not args.no_memory:
+        header += f" {'пик, МБ':>8} {'поток, МБ':>8}"
+    print(header)
+
+    cases = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for weeks in args.weeks:
+            for slots_per_day in args.slots_per_day:
+                if weeks * 7 * slots_per_day > args.max_slots:
+                    print(f"{weeks:>6} {slots_per_day:>4} — пропущено (--max-slots {args.max_slots})")
+                    continue
+                case = run_case(tmp, weeks, slots_per_day, not args.no_memory)
+                print_case(case)
+                cases.append(case)
+
+    result = {
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'git_revision': revision,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'yaml_loader': FastLoader.__name__,
+        'pyyaml': yaml.__version__,
+        'icalendar': icalendar.__version__,
+        'cases': cases,
+    }
+
+    output = args.output
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}-{revision or 'local'}.json")
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+    print(f"\n💾 Результаты: {output}")
+
+    if args.compare:
+        compare(args.compare, cases)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Синтетические расписания для бенчмарков (формат multiweek-schedule.yaml)
+"""
+
+from datetime import date, timedelta
+
+import yaml
+
+WEEKDAYS = ('monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday')
+
+SPECIALISTS = (
+    'meditation-guide', 'psychologist', 'executive-coach', 'yoga-instructor',
+    'fitness-trainer', 'nutritionist', 'psychotherapist', 'life-coach',
+    'career-consultant', 'business-trainer', 'mentor', 'hypnologist',
+)
+
+STATUSES = ('planned', 'planned', 'planned', 'completed')
+
+def make_schedule(num_weeks, slots_per_day=4, start_date=date(2026, 2, 16)):
+    """Строит словарь расписания на num_weeks недель по slots_per_day слотов в день"""
+    # Слоты равномерно распределяются с 06:00 по 15 минут, без пересечений
+    step = max(15, (16 * 60) // slots_per_day // 15 * 15)
+    weeks = []
+    counter = 0
+    for week_index in range(num_weeks):
+        week_start = start_date + timedelta(weeks=week_index)
+        days = {}
+        for day_index, day_name in enumerate(WEEKDAYS):
+            slots = []
+            for slot_index in range(slots_per_day):
+                minutes = 6 * 60 + slot_index * step
+                specialist = SPECIALISTS[(day_index + slot_index) % len(SPECIALISTS)]
+                slots.append({
+                    'time': f"{minutes // 60:02d}:{minutes % 60:02d}",
+                    'duration': min(step, 60),
+                    'specialist': specialist,
+                    'topic': f"Тема {week_index + 1}.{slot_index + 1} для {specialist}",
+                    'week_context': f"Неделя {week_index + 1}",
+                    'status': STATUSES[counter % len(STATUSES)],
+                    'notes': '',
+                })
+                counter += 1
+            days[day_name] = {
+                'date': (week_start + timedelta(days=day_index)).isoformat(),
+                'theme': f"Тема дня {day_index + 1}",
+                'slots': slots,
+            }
+        weeks.append({
+            'week_number': week_index + 1,
+            'start_date': week_start.isoformat(),
+            'days': days,
+        })
+
+    return {
+        'meta': {
+            'owner': 'benchmark',
+            'timezone': 'Europe/Kiev',
+            'start_date': start_date.isoformat(),
+            'num_weeks': num_weeks,
+        },
+        'weeks': weeks,
+    }
+
+def write_schedule(path, num_weeks, slots_per_day=4):
+    """Записывает синтетическое расписание в YAML и возвращает число слотов"""
+    schedule = make_schedule(num_weeks, slots_per_day)
+    dumper = getattr(yaml, 'CSafeDumper', yaml.SafeDumper)
+    with open(path, 'w', encoding='utf-8') as f:
+        yaml.dump(schedule, f, Dumper=dumper, allow_unicode=True, sort_keys=False)
+    return num_weeks * 7 * slots_per_day
@@ -3,130 +3,600 @@
 Экспорт расписания самосовершенствования в формат ICS для импорта в календарь
 """
 
+import argparse
+import functools
+import hashlib
+import json
+import mmap
 import yaml
 import os
-from datetime import datetime, timedelta
-from icalendar import Calendar, Event, vText
+import sqlite3
+from collections import Counter
+from contextlib import nullcontext
+from datetime import date, datetime, timedelta
+from icalendar import Calendar, Event, Timezone, vText
 import pytz
 
-def load_schedule():
+from profiling import StageTimer, profiled
+from schedule_loader import FastLoader, StreamingLoader, load_yaml
+from schedule_model import WEEKDAYS, build_schedule, build_week, parse_date, resolve_timezone
+
+# Словарь имен специалистов (можно расширить)
+SPECIALIST_NAMES = {
+    'meditation-guide': 'Гид медитации',
+    'psychologist': 'Психолог',
+    'executive-coach': 'Коуч по лидерству',
+    'yoga-instructor': 'Инструктор йоги',
+    'fitness-trainer': 'Тренер по фитнесу',
+    'nutritionist': 'Нутрициолог',
+    'psychotherapist': 'Психотерапевт',
+    'life-coach': 'Лайф-коуч',
+    'career-advisor': 'Карьерный консультант',
+    'financial-advisor': 'Финансовый советник',
+    'relationship-coach': 'Коуч по отношениям',
+    'creativity-coach': 'Коуч по креативности',
+    'mindfulness-teacher': 'Учитель осознанности',
+    'energy-healer': 'Целитель энергии',
+    'spiritual-guide': 'Духовный гид',
+    'philosophy-teacher': 'Философ',
+    'science-teacher': 'Учитель науки',
+    'art-teacher': 'Учитель искусства',
+    'music-teacher': 'Учитель музыки',
+    'language-teacher': 'Учитель языка',
+    'history-teacher': 'Учитель истории',
+    'future-planner': 'Планировщик будущего'
+}
+
+WEEKLY_SCHEDULE_PATH = 'schedule/weekly-schedule.yaml'
+WEEKLY_ICS_PATH = 'schedule/weekly-schedule.ics'
+MULTIWEEK_SCHEDULE_PATH = 'schedule/multiweek-schedule.yaml'
+MULTIWEEK_ICS_PATH = 'schedule/multiweek-schedule.ics'
+
+# Горизонт VTIMEZONE, если в meta нет num_weeks
+DEFAULT_PROGRAM_YEARS = 10
+
+UID_DOMAIN = 'hu-claude'
+MANIFEST_VERSION = 3
+
+# Сколько строк манифеста копить перед записью в SQLite
+MANIFEST_BATCH = 1000
+
+CALENDAR_FOOTER = b'END:VCALENDAR\r\n'
+
+class NotAScheduleError(ValueError):
+    """YAML файл не является расписанием (например, schedule/program.yaml)"""
+
+def check_schedule(schedule, source):
+    """NotAScheduleError, если разобранный YAML не похож на расписание"""
+    if not isinstance(schedule, dict) or 'meta' not in schedule:
+        raise NotAScheduleError(f"{source}: нет секции meta — это не файл расписания")
+    if 'weeks' not in schedule and not any(day in schedule for day in WEEKDAYS):
+        raise NotAScheduleError(f"{source}: нет ни weeks, ни дней недели — это не файл расписания")
+
+
+def load_schedule(schedule_path=WEEKLY_SCHEDULE_PATH):
     """Загружает расписание из YAML файла"""
-    schedule_path = 'schedule/weekly-schedule.yaml'
     if not os.path.exists(schedule_path):
         print(f"❌ Файл {schedule_path} не найден")
         return None
 
-    with open(schedule_path, 'r', encoding='utf-8') as f:
-        return yaml.safe_load(f)
+    return load_yaml(schedule_path)
 
-def create_ics_event(cal, slot, date, specialist_name):
-    """Создает событие в календаре"""
-    # Парсим время
-    time_obj = datetime.strptime(slot['time'], '%H:%M').time()
+def slot_uid(slot):
+    """Стабильный UID слота: дата, время и специалист"""
+    return f"{slot.date:%Y%m%d}T{slot.time:%H%M}-{slot.specialist}@{UID_DOMAIN}"
 
-    # Создаем datetime объект
-    start_datetime = datetime.combine(date, time_obj)
+def slot_digest(slot, specialist_name):
+    """Хэш содержимого слота — меняется, если поменялось хоть одно поле события"""
+    payload = json.dumps([str(slot.start.tzinfo), specialist_name, slot.as_dict()],
+                         sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
 
-    # Добавляем часовой пояс (из мета данных)
-    timezone = pytz.timezone('Asia/Tokyo')  # Можно сделать configurable
-    start_datetime = timezone.localize(start_datetime)
+def event_texts(slot, specialist_name):
+    """SUMMARY и DESCRIPTION события для слота"""
+    summary = f"{specialist_name}: {slot.topic}"
+    description = f"Специалист: {specialist_name}\nТема: {slot.topic}\nСтатус: {slot.status}"
+    if slot.notes:
+        description += f"\nЗаметки: {slot.notes}"
+    return summary, description
 
-    # Вычисляем время окончания
-    end_datetime = start_datetime + timedelta(minutes=slot['duration'])
+def build_ics_event(slot, specialist_name):
+    """Создает событие календаря для одного слота"""
+    summary, description = event_texts(slot, specialist_name)
 
-    # Создаем событие
+    # Создаем событие (start/end уже посчитаны моделью в нужном часовом поясе)
     event = Event()
-    event.add('summary', f"{specialist_name}: {slot['topic']}")
-    event.add('dtstart', start_datetime)
-    event.add('dtend', end_datetime)
-    event.add('description', f"Специалист: {specialist_name}\nТема: {slot['topic']}\nСтатус: {slot['status']}")
-    if slot.get('notes'):
-        event.add('description', event['description'] + f"\nЗаметки: {slot['notes']}")
+    event.add('uid', slot_uid(slot))
+    event.add('summary', summary)
+    event.add('dtstart', slot.start)
+    event.add('dtend', slot.end)
+    event.add('description', description)
+
+    return event
 
+def render_event(slot, specialist_name, timer=None):
+    """Сериализованный VEVENT слота; с timer время делится на create_ics_event и to_ical"""
+    if timer is None:
+        return build_ics_event(slot, specialist_name).to_ical()
+    with timer.stage('create_ics_event'):
+        event = build_ics_event(slot, specialist_name)
+    with timer.stage('to_ical'):
+        return event.to_ical()
+
+def create_ics_event(cal, slot, specialist_name):
+    """Создает событие в календаре"""
     # Добавляем в календарь
-    cal.add_component(event)
+    cal.add_component(build_ics_event(slot, specialist_name))
 
-def export_to_ics(schedule):
-    """Экспортирует расписание в ICS формат"""
-    # Создаем календарь
+def create_calendar(tzid=None):
+    """Создает пустой календарь с заголовками программы"""
     cal = Calendar()
     cal.add('prodid', '-//AI Self-Improvement System//hu-claude//')
     cal.add('version', '2.0')
     cal.add('x-wr-calname', vText('Программа самосовершенствования'))
+    if tzid:
+        cal.add('x-wr-timezone', vText(tzid))
+    return cal
+
+def timezone_id(tz):
+    return getattr(tz, 'zone', None) or str(tz)
+
+@functools.lru_cache(maxsize=None)
+def vtimezone_ical(tzid, first_year, last_year):
+    """Сериализованный VTIMEZONE — строится один раз на пояс и диапазон лет"""
+    return Timezone.from_tzid(tzid, first_date=date(first_year, 1, 1),
+                              last_date=date(last_year + 1, 1, 1)).to_ical()
+
+def program_years(meta):
+    """Диапазон лет программы по meta.start_date и meta.num_weeks"""
+    start = parse_date((meta or {}).get('start_date') or date.today())
+    num_weeks = (meta or {}).get('num_weeks')
+    if num_weeks:
+        end = start + timedelta(weeks=num_weeks)
+    else:
+        end = start.replace(year=start.year + DEFAULT_PROGRAM_YEARS)
+    return start.year, end.year
+
+def calendar_header(meta, tz):
+    """Начало календаря до первого VEVENT: заголовки и VTIMEZONE пояса tz"""
+    tzid = timezone_id(tz)
+    header = create_calendar(tzid).to_ical()
+    return header[:-len(CALENDAR_FOOTER)] + vtimezone_ical(tzid, *program_years(meta))
+
+def build_model(schedule, timer=None):
+    """Строит модель расписания, при профилировании — как этап build_model.
+
+    Отдельное имя: slot_loop — это обход слотов (wrap_iter) при записи .ics.
+    """
+    if timer is None:
+        return build_schedule(schedule)
+    with timer.stage('build_model'):
+        return build_schedule(schedule)
+
+def export_to_ics(schedule, ics_path=WEEKLY_ICS_PATH, full=False, compress=False, timer=None):
+    """Экспортирует расписание в ICS формат"""
+    model = build_model(schedule, timer)
+    header = calendar_header(model.meta, model.timezone)
+    if compress:
+        stats = write_ics_compressed(ics_path, model.iter_slots(), header, model.timezone, timer=timer)
+    else:
+        stats = write_ics_incremental(ics_path, model.iter_slots(), header, full=full, timer=timer)
+    print_export_stats(ics_path, stats)
+
+    return ics_path
+
+def iter_multiweek(stream):
+    """Потоково читает multiweek-расписание.
+
+    Отдает ('meta', dict), ('weeks', None) перед началом списка weeks и
+    затем по одной ('week', dict) на каждую неделю. Неделя конструируется
+    только когда до нее дошел парсер, поэтому в памяти одновременно
+    находится одна неделя.
+    """
+    loader = StreamingLoader(stream)
+    try:
+        # StreamStart, DocumentStart, MappingStart корневого документа
+        loader.get_event()
+        loader.get_event()
+        if not loader.check_event(yaml.MappingStartEvent):
+            raise NotAScheduleError("Ожидался словарь на верхнем уровне расписания")
+        loader.get_event()
+
+        while not loader.check_event(yaml.MappingEndEvent):
+            key = loader.construct_document(loader.compose_node(None, None))
+
+            if key == 'weeks' and loader.check_event(yaml.SequenceStartEvent):
+                yield 'weeks', None
+                loader.get_event()
+                while not loader.check_event(yaml.SequenceEndEvent):
+                    node = loader.compose_node(None, None)
+                    yield 'week', loader.construct_document(node)
+                loader.get_event()
+            else:
+                value = loader.construct_document(loader.compose_node(None, None))
+                if key == 'meta':
+                    yield 'meta', value
+    finally:
+        loader.dispose()
+
+def load_whole_schedule(stream, timer=None):
+    """Запасной путь: разбирает файл целиком и строит модель (meta не первой, недельный формат)"""
+    stream.seek(0)
+    with (timer.stage('load_schedule') if timer else nullcontext()):
+        schedule = yaml.load(stream, Loader=FastLoader)
+    check_schedule(schedule, getattr(stream, 'name', 'расписание'))
+    model = build_model(schedule, timer)
+    return model.meta, model.timezone, model.iter_slots()
+
+def open_multiweek_slots(stream, timer=None):
+    """Возвращает (meta, tz, генератор слотов) по структуре weeks -> days -> slots.
+
+    Потоково, если meta идет первой, а за ней список weeks (так пишет
+    generate_schedule.py): заголовок календаря с часовым поясом нужен до
+    разбора недель. Иначе файл разбирается целиком через build_schedule,
+    чтобы не записать календарь в чужом поясе или пустым.
+    С timer разбор YAML учитывается отдельным этапом load_schedule.
+    """
+    records = iter_multiweek(stream)
+    if timer is not None:
+        records = timer.wrap_iter('load_schedule', records)
+    first = next(records, None)
+    second = next(records, None) if first and first[0] == 'meta' else None
+    if second is None or second[0] != 'weeks':
+        records.close()
+        return load_whole_schedule(stream, timer)
+
+    meta = first[1] or {}
+    tz = resolve_timezone(meta)
+
+    def slots():
+        for kind, data in records:
+            if kind == 'week':
+                yield from build_week(data, tz).iter_slots()
+
+    return meta, tz, slots()
+
+def manifest_path_for(ics_path):
+    """Путь к манифесту инкрементального экспорта рядом с .ics"""
+    return ics_path + '.manifest.db'
+
+def open_manifest(ics_path):
+    """Открывает манифест (SQLite), если он соответствует текущему .ics файлу.
+
+    Манифест не загружается в память целиком: события ищутся по UID
+    запросом к индексу, поэтому потоковый экспорт остается O(1) по памяти.
+    """
+    manifest_path = manifest_path_for(ics_path)
+    if not (os.path.exists(manifest_path) and os.path.exists(ics_path)):
+        return None
+
+    conn = sqlite3.connect(manifest_path)
+    try:
+        row = conn.execute("SELECT version, size FROM manifest").fetchone()
+    except sqlite3.Error:
+        row = None
+
+    # Файл правили руками или манифест от другой версии — собираем заново
+    if row is None or row[0] != MANIFEST_VERSION or row[1] != os.path.getsize(ics_path):
+        conn.close()
+        return None
+    return conn
+
+def create_manifest(path):
+    """Новый пустой манифест; пишется во временный файл, поэтому без журнала"""
+    if os.path.exists(path):
+        os.remove(path)
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        PRAGMA journal_mode = OFF;
+        PRAGMA synchronous = OFF;
+        CREATE TABLE manifest (version INTEGER, size INTEGER);
+        CREATE TABLE events (
+            uid TEXT PRIMARY KEY,
+            digest TEXT NOT NULL,
+            offset INTEGER NOT NULL,
+            length INTEGER NOT NULL
+        ) WITHOUT ROWID;
+    """)
+    return conn
+
+def write_ics_incremental(ics_path, slots, header, full=False, timer=None):
+    """Пишет календарь, пересериализуя только изменившиеся слоты.
+
+    Для каждого события манифест хранит хэш слота и положение VEVENT в
+    предыдущем .ics. Неизменившиеся события копируются байтами из старого
+    файла, так что время экспорта зависит от размера изменений, а не от
+    размера расписания. Старый манифест читается по одному UID, новый
+    пишется пачками по MANIFEST_BATCH строк — память не растет с числом
+    слотов. Возвращает словарь со счетчиками.
+    """
+    if timer is not None:
+        slots = timer.wrap_iter('slot_loop', slots)
+
+    old_manifest = None if full else open_manifest(ics_path)
+    tmp_path = ics_path + '.tmp'
+    manifest_path = manifest_path_for(ics_path)
+    manifest = create_manifest(manifest_path + '.tmp')
 
-    # Получаем стартовую дату
-    start_date = datetime.strptime(schedule['meta']['start_date'], '%Y-%m-%d').date()
-
-    # Словарь дней недели
-    days_map = {
-        'monday': 0,
-        'tuesday': 1,
-        'wednesday': 2,
-        'thursday': 3,
-        'friday': 4,
-        'saturday': 5,
-        'sunday': 6
-    }
-
-    # Словарь имен специалистов (можно расширить)
-    specialist_names = {
-        'meditation-guide': 'Гид медитации',
-        'psychologist': 'Психолог',
-        'executive-coach': 'Коуч по лидерству',
-        'yoga-instructor': 'Инструктор йоги',
-        'fitness-trainer': 'Тренер по фитнесу',
-        'nutritionist': 'Нутрициолог',
-        'psychotherapist': 'Психотерапевт',
-        'life-coach': 'Лайф-коуч',
-        'career-advisor': 'Карьерный консультант',
-        'financial-advisor': 'Финансовый советник',
-        'relationship-coach': 'Коуч по отношениям',
-        'creativity-coach': 'Коуч по креативности',
-        'mindfulness-teacher': 'Учитель осознанности',
-        'energy-healer': 'Целитель энергии',
-        'spiritual-guide': 'Духовный гид',
-        'philosophy-teacher': 'Философ',
-        'science-teacher': 'Учитель науки',
-        'art-teacher': 'Учитель искусства',
-        'music-teacher': 'Учитель музыки',
-        'language-teacher': 'Учитель языка',
-        'history-teacher': 'Учитель истории',
-        'future-planner': 'Планировщик будущего'
-    }
-
-    # Обрабатываем каждый день недели
-    for day_name, day_data in schedule.items():
-        if day_name == 'meta':
+    stats = {'events': 0, 'reused': 0, 'rebuilt': 0}
+    rows = []
+    insert = "INSERT OR REPLACE INTO events VALUES (?, ?, ?, ?)"
+
+    old_file = open(ics_path, 'rb') if old_manifest is not None else None
+    old_data = None
+    try:
+        if old_file is not None and os.path.getsize(ics_path):
+            old_data = mmap.mmap(old_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        with open(tmp_path, 'wb') as out:
+            out.write(header)
+            out.flush()
+            offset = len(header)
+
+            for slot in slots:
+                specialist_name = SPECIALIST_NAMES.get(slot.specialist, slot.specialist)
+                uid = slot_uid(slot)
+                digest = slot_digest(slot, specialist_name)
+
+                previous = None
+                if old_data is not None:
+                    previous = old_manifest.execute(
+                        "SELECT digest, offset, length FROM events WHERE uid = ?", (uid,)).fetchone()
+                if previous and previous[0] == digest:
+                    chunk = old_data[previous[1]:previous[1] + previous[2]]
+                    stats['reused'] += 1
+                else:
+                    chunk = render_event(slot, specialist_name, timer)
+                    stats['rebuilt'] += 1
+
+                out.write(chunk)
+                rows.append((uid, digest, offset, len(chunk)))
+                if len(rows) >= MANIFEST_BATCH:
+                    manifest.executemany(insert, rows)
+                    rows.clear()
+                offset += len(chunk)
+                stats['events'] += 1
+
+            out.write(CALENDAR_FOOTER)
+            offset += len(CALENDAR_FOOTER)
+
+        manifest.executemany(insert, rows)
+        manifest.execute("INSERT INTO manifest VALUES (?, ?)", (MANIFEST_VERSION, offset))
+        manifest.commit()
+    finally:
+        manifest.close()
+        if old_data is not None:
+            old_data.close()
+        if old_file is not None:
+            old_file.close()
+        if old_manifest is not None:
+            old_manifest.close()
+
+    os.replace(tmp_path, ics_path)
+    os.replace(manifest_path + '.tmp', manifest_path)
+
+    return stats
+
+def series_uid(slot):
+    """UID серии: специалист, день недели, время и длительность.
+
+    День недели берется из WEEKDAYS, а не через %a, который зависит от локали;
+    три буквы — те же UID, что давал %a в локали C.
+    """
+    weekday = WEEKDAYS[slot.date.weekday()][:3]
+    return f"series-{slot.specialist}-{weekday}-{slot.time:%H%M}-{slot.duration}@{UID_DOMAIN}".lower()
+
+def build_series_events(group, specialist_name, tz):
+    """Сворачивает слоты одной серии (отсортированные по дате) в RRULE/RDATE событие.
+
+    Базовые SUMMARY/DESCRIPTION берутся по самому частому варианту в серии,
+    отличающиеся вхождения записываются переопределениями с RECURRENCE-ID.
+    Пропущенные недели внутри серии уходят в EXDATE; если пропусков больше,
+    чем вхождений, вместо RRULE используется список RDATE.
+    """
+    first, last = group[0], group[-1]
+    uid = series_uid(first)
+    texts = [event_texts(slot, specialist_name) for slot in group]
+    base_summary, base_description = Counter(texts).most_common(1)[0][0]
+
+    master = Event()
+    master.add('uid', uid)
+    master.add('summary', base_summary)
+    master.add('dtstart', first.start)
+    master.add('dtend', first.end)
+    master.add('description', base_description)
+
+    present = {slot.date for slot in group}
+    missing = []
+    day = first.date + timedelta(weeks=1)
+    while day < last.date:
+        if day not in present:
+            missing.append(day)
+        day += timedelta(weeks=1)
+
+    if len(missing) < len(group) - 1:
+        master.add('rrule', {'freq': 'weekly', 'until': last.start.astimezone(pytz.utc)})
+        if missing:
+            master.add('exdate', [tz.localize(datetime.combine(day, first.time)) for day in missing])
+    else:
+        master.add('rdate', [slot.start for slot in group[1:]])
+
+    events = [master]
+    for slot, (summary, description) in zip(group, texts):
+        if summary == base_summary and description == base_description:
             continue
+        override = Event()
+        override.add('uid', uid)
+        override.add('recurrence-id', slot.start)
+        override.add('summary', summary)
+        override.add('dtstart', slot.start)
+        override.add('dtend', slot.end)
+        override.add('description', description)
+        events.append(override)
+
+    return events
 
-        day_offset = days_map[day_name]
-        current_date = start_date + timedelta(days=day_offset)
+def write_ics_compressed(ics_path, slots, header, tz, timer=None):
+    """Пишет календарь, сворачивая еженедельные повторы в повторяющиеся события.
+
+    Серия — это слоты с одинаковыми специалистом, днем недели, временем и
+    длительностью. Для группировки нужен весь список слотов, поэтому этот
+    режим не потоковый и не инкрементальный: манифест удаляется.
+    """
+    if timer is not None:
+        slots = timer.wrap_iter('slot_loop', slots)
+
+    groups = {}
+    singles = []
+    stats = {'events': 0, 'series': 0, 'overrides': 0, 'components': 0}
+    for slot in slots:
+        stats['events'] += 1
+        group = groups.setdefault((slot.specialist, slot.date.weekday(), slot.time, slot.duration), {})
+        if slot.date in group:
+            # Два одинаковых слота в один день — второй пишем отдельным событием
+            singles.append(slot)
+        else:
+            group[slot.date] = slot
+
+    components = []
+    for (specialist, _, _, _), group in groups.items():
+        group = [group[day] for day in sorted(group)]
+        if len(group) == 1:
+            singles.append(group[0])
+            continue
+        specialist_name = SPECIALIST_NAMES.get(specialist, specialist)
+        with (timer.stage('create_ics_event') if timer else nullcontext()):
+            events = build_series_events(group, specialist_name, tz)
+        if len(events) >= len(group):
+            # Темы меняются каждую неделю — серия из одних переопределений не выгоднее
+            singles.extend(group)
+            continue
+        stats['series'] += 1
+        stats['overrides'] += len(events) - 1
+        components.append((group[0].start, events))
 
-        for slot in day_data['slots']:
-            specialist = slot['specialist']
-            specialist_name = specialist_names.get(specialist, specialist)
-            create_ics_event(cal, slot, current_date, specialist_name)
+    for slot in singles:
+        specialist_name = SPECIALIST_NAMES.get(slot.specialist, slot.specialist)
+        with (timer.stage('create_ics_event') if timer else nullcontext()):
+            components.append((slot.start, [build_ics_event(slot, specialist_name)]))
 
-    # Сохраняем в файл
-    ics_path = 'schedule/weekly-schedule.ics'
-    with open(ics_path, 'wb') as f:
-        f.write(cal.to_ical())
+    components.sort(key=lambda item: item[0])
 
+    tmp_path = ics_path + '.tmp'
+    with open(tmp_path, 'wb') as out:
+        out.write(header)
+        with (timer.stage('to_ical') if timer else nullcontext()):
+            for _, events in components:
+                for event in events:
+                    out.write(event.to_ical())
+                    stats['components'] += 1
+        out.write(CALENDAR_FOOTER)
+    os.replace(tmp_path, ics_path)
+
+    manifest_path = manifest_path_for(ics_path)
+    if os.path.exists(manifest_path):
+        os.remove(manifest_path)
+
+    return stats
+
+def print_export_stats(ics_path, stats):
     print(f"✅ Календарь экспортирован: {ics_path}")
-    print(f"📅 Событий создано: {len(cal.subcomponents)}")
+    print(f"📅 Событий создано: {stats['events']}")
+    if 'series' in stats:
+        print(f"🔁 Серий: {stats['series']}, переопределений: {stats['overrides']}, "
+              f"VEVENT в файле: {stats['components']}")
+    else:
+        print(f"♻️  Без изменений: {stats['reused']}, пересобрано: {stats['rebuilt']}")
+
+def export_multiweek_to_ics(schedule_path=MULTIWEEK_SCHEDULE_PATH, ics_path=MULTIWEEK_ICS_PATH,
+                            full=False, compress=False, timer=None):
+    """Потоково экспортирует multiweek-расписание в ICS формат"""
+    if not os.path.exists(schedule_path):
+        print(f"❌ Файл {schedule_path} не найден")
+        return None
+
+    with open(schedule_path, 'rb') as src:
+        try:
+            meta, tz, slots = open_multiweek_slots(src, timer)
+        except NotAScheduleError as exc:
+            print(f"❌ {exc}")
+            return None
+        header = calendar_header(meta, tz)
+        if compress:
+            stats = write_ics_compressed(ics_path, slots, header, tz, timer=timer)
+        else:
+            stats = write_ics_incremental(ics_path, slots, header, full=full, timer=timer)
+
+    print_export_stats(ics_path, stats)
 
     return ics_path
 
-def main():
-    print("📤 Экспорт расписания в ICS формат...")
+def export_file(schedule_path, ics_path=None, full=False, use_cache=True, compress=False):
+    """Экспортирует один файл расписания любого формата без вывода в консоль.
+
+    Используется пакетным экспортом; ics_path по умолчанию — рядом с YAML.
+    Возвращает словарь со счетчиками write_ics_incremental/write_ics_compressed.
+    """
+    if ics_path is None:
+        ics_path = os.path.splitext(schedule_path)[0] + '.ics'
+
+    schedule = load_yaml(schedule_path, use_cache=use_cache)
+    check_schedule(schedule, schedule_path)
+
+    model = build_schedule(schedule)
+    header = calendar_header(model.meta, model.timezone)
+    if compress:
+        return write_ics_compressed(ics_path, model.iter_slots(), header, model.timezone)
+    return write_ics_incremental(ics_path, model.iter_slots(), header, full=full)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Экспорт расписания в ICS формат")
+    parser.add_argument('--multiweek', action='store_true',
+                        help="потоковый экспорт многонедельного расписания (weeks -> days -> slots)")
+    parser.add_argument('-i', '--input', help="путь к YAML расписанию")
+    parser.add_argument('-o', '--output', help="путь к результирующему .ics")
+    parser.add_argument('--full', action='store_true',
+                        help="игнорировать манифест и пересобрать все события")
+    parser.add_argument('--compress', action='store_true',
+                        help="сворачивать еженедельные повторы в RRULE-события")
+    parser.add_argument('--profile', action='store_true',
+                        help="вывести время по этапам и статистику cProfile")
+    parser.add_argument('--profile-output', help="куда сохранить cProfile (по умолчанию <ics>.prof)")
+    return parser.parse_args(argv)
+
+def run_export(args, timer=None):
+    """Выполняет экспорт по аргументам командной строки; возвращает путь к .ics"""
+    if args.multiweek:
+        return export_multiweek_to_ics(args.input or MULTIWEEK_SCHEDULE_PATH,
+                                       args.output or MULTIWEEK_ICS_PATH,
+                                       full=args.full, compress=args.compress, timer=timer)
 
     # Загружаем расписание
-    schedule = load_schedule()
+    with (timer.stage('load_schedule') if timer else nullcontext()):
+        schedule = load_schedule(args.input or WEEKLY_SCHEDULE_PATH)
     if not schedule:
-        return
+        return None
 
     # Экспортируем в ICS
-    ics_path = export_to_ics(schedule)
+    return export_to_ics(schedule, args.output or WEEKLY_ICS_PATH,
+                         full=args.full, compress=args.compress, timer=timer)
+
+def main(argv=None):
+    args = parse_args(argv)
+    print("📤 Экспорт расписания в ICS формат...")
+
+    if args.profile:
+        default_output = args.output or (MULTIWEEK_ICS_PATH if args.multiweek else WEEKLY_ICS_PATH)
+        timer = StageTimer()
+        with profiled(args.profile_output or default_output + '.prof'):
+            with timer.stage('total'):
+                ics_path = run_export(args, timer)
+        timer.print_report()
+    else:
+        ics_path = run_export(args)
+
+    if not ics_path:
+        return
 
     print("\n📋 Инструкции по импорту:")
     print(f"1. Откройте файл {ics_path}")
@@ -134,4 +604,4 @@ def main():
     print("3. Или используйте онлайн-сервисы для конвертации ICS")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
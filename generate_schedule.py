@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+"""
+Генерация многонедельного расписания из описания программы
+
+Берет schedule/program.yaml (шаблон недели, темы специалистов и правила
+чередования, окна и лимиты дня), раскладывает программу на N недель,
+проверяет пересечения слотов и дневную нагрузку и потоково, неделя за
+неделей, пишет schedule/multiweek-schedule.yaml.
+
+Примеры:
+    python3 generate_schedule.py '16 февраля 2026 года в 8:00'
+    python3 generate_schedule.py 2026-02-16 --weeks 520 -o /tmp/ten-years.yaml
+    python3 generate_schedule.py 2026-02-16 --check
+"""
+
+import argparse
+import functools
+import heapq
+import os
+import re
+import sys
+from datetime import date, datetime, timedelta
+
+import yaml
+
+from schedule_loader import load_yaml
+from schedule_model import WEEKDAYS, parse_time
+
+PROGRAM_PATH = 'schedule/program.yaml'
+OUTPUT_PATH = 'schedule/multiweek-schedule.yaml'
+
+DEFAULT_DAY_WINDOW = ('07:00', '22:00')
+
+MONTHS = {
+    'января': 1, 'февраля': 2, 'марта': 3, 'апреля': 4, 'мая': 5, 'июня': 6,
+    'июля': 7, 'августа': 8, 'сентября': 9, 'октября': 10, 'ноября': 11, 'декабря': 12,
+}
+
+RUSSIAN_DATE_RE = re.compile(
+    r'^\s*(\d{1,2})\s+([а-яё]+)\s+(\d{4})(?:\s+года)?(?:\s*(?:в|,)?\s*(\d{1,2}):(\d{2}))?\s*$',
+    re.IGNORECASE)
+
+Dumper = getattr(yaml, 'CSafeDumper', yaml.SafeDumper)
+
+# Ширина строки для скаляров — без переносов длинных тем (C-эмиттер принимает int)
+SCALAR_WIDTH = 1 << 20
+
+def parse_start(text):
+    """Разбирает '16 февраля 2026 года в 8:00', '2026-02-16 08:00' или '2026-02-16'"""
+    match = RUSSIAN_DATE_RE.match(text)
+    if match:
+        day, month_name, year, hours, minutes = match.groups()
+        month = MONTHS.get(month_name.lower())
+        if month is None:
+            raise ValueError(f"Неизвестный месяц: {month_name}")
+        return datetime(int(year), month, int(day), int(hours or 0), int(minutes or 0))
+
+    for fmt in ('%Y-%m-%d %H:%M', '%Y-%m-%dT%H:%M', '%Y-%m-%d'):
+        try:
+            return datetime.strptime(text.strip(), fmt)
+        except ValueError:
+            continue
+    raise ValueError(f"Не удалось разобрать дату начала: {text!r}")
+
+def minutes_of(value):
+    slot_time = parse_time(value)
+    return slot_time.hour * 60 + slot_time.minute
+
+def find_overlaps(intervals):
+    """Пересекающиеся пары среди (start, end, label) за O(n log n + k).
+
+    Интервалы сортируются по началу, активные хранятся в куче по концу:
+    все, что закончилось до начала текущего, выталкивается, остальные
+    активные пересекаются с текущим. Касание (08:00-08:30 и 08:30) не конфликт.
+    """
+    overlaps = []
+    active = []
+    for start, end, label in sorted(intervals):
+        while active and active[0][0] <= start:
+            heapq.heappop(active)
+        for _, other_start, other_label in active:
+            overlaps.append((other_label, label))
+        heapq.heappush(active, (end, start, label))
+    return overlaps
+
+def check_day(day_name, day_date, slots, limits, window):
+    """Проблемы дня: пересечения, выход за окно, превышение лимитов нагрузки"""
+    problems = []
+    intervals = []
+    total_minutes = 0
+    window_start, window_end = window
+    for slot in slots:
+        start = minutes_of(slot['time'])
+        end = start + slot['duration']
+        total_minutes += slot['duration']
+        label = f"{slot['time']}+{slot['duration']} {slot['specialist']}"
+        intervals.append((start, end, label))
+        if start < window_start or end > window_end:
+            problems.append(f"{label} вне окна дня")
+
+    for first, second in find_overlaps(intervals):
+        problems.append(f"пересечение: {first} и {second}")
+
+    max_sessions = limits.get('max_sessions_per_day')
+    if max_sessions and len(slots) > max_sessions:
+        problems.append(f"{len(slots)} сессий при лимите {max_sessions}")
+    max_minutes = limits.get('max_minutes_per_day')
+    if max_minutes and total_minutes > max_minutes:
+        problems.append(f"{total_minutes} мин при лимите {max_minutes}")
+
+    return [f"{day_date.isoformat()} ({day_name}): {problem}" for problem in problems]
+
+def pick(rotation, index):
+    """Элемент правила чередования: значение или список, который идет по кругу"""
+    if isinstance(rotation, list):
+        return rotation[index % len(rotation)]
+    return rotation
+
+def topic_for(specialists, specialist, week_index):
+    definition = specialists.get(specialist) or {}
+    topics = definition.get('topics') or []
+    if not topics:
+        return definition.get('topic', '')
+    if definition.get('rotation') == 'hold':
+        return topics[min(week_index, len(topics) - 1)]
+    return topics[week_index % len(topics)]
+
+def day_window(program, day_definition):
+    limits = program.get('limits') or {}
+    window = day_definition.get('window') or limits.get('day_window') or DEFAULT_DAY_WINDOW
+    return minutes_of(window[0]), minutes_of(window[1])
+
+def iter_weeks(program, start, num_weeks, problems):
+    """Генератор недель расписания; найденные проблемы дописываются в problems"""
+    days = program.get('days') or {}
+    specialists = program.get('specialists') or {}
+    limits = program.get('limits') or {}
+    windows = {name: day_window(program, definition or {}) for name, definition in days.items()}
+    first_day_from = start.hour * 60 + start.minute
+
+    for week_index in range(num_weeks):
+        week_start = start.date() + timedelta(weeks=week_index)
+        week_days = {}
+        for offset in range(7):
+            day_date = week_start + timedelta(days=offset)
+            day_name = WEEKDAYS[day_date.weekday()]
+            definition = days.get(day_name)
+            if not definition:
+                continue
+
+            slots = []
+            for template in definition.get('slots') or ():
+                if week_index == 0 and offset == 0 and minutes_of(template['time']) < first_day_from:
+                    # Программа стартует не с начала первого дня
+                    continue
+                specialist = pick(template['specialist'], week_index)
+                slots.append({
+                    'time': parse_time(template['time']).strftime('%H:%M'),
+                    'duration': template['duration'],
+                    'specialist': specialist,
+                    'topic': pick(template['topic'], week_index) if template.get('topic')
+                    else topic_for(specialists, specialist, week_index),
+                    'week_context': f"Неделя {week_index + 1}",
+                    'status': 'planned',
+                    'notes': '',
+                })
+
+            problems.extend(check_day(day_name, day_date, slots, limits, windows[day_name]))
+            week_days[day_name] = {
+                'date': day_date.isoformat(),
+                'theme': definition.get('theme', ''),
+                'slots': slots,
+            }
+
+        yield {
+            'week_number': week_index + 1,
+            'start_date': week_start.isoformat(),
+            'days': week_days,
+        }
+
+@functools.lru_cache(maxsize=None)
+def render_scalar(value):
+    """YAML-представление скаляра (кавычки по правилам PyYAML), кэшируется.
+
+    Темы, даты и время повторяются из недели в неделю, поэтому representer
+    PyYAML вызывается один раз на уникальное значение, а не на каждый слот.
+    """
+    text = yaml.dump(value, Dumper=Dumper, allow_unicode=True, width=SCALAR_WIDTH)
+    if text.endswith('\n...\n'):
+        text = text[:-len('\n...\n')]
+    text = text.rstrip('\n')
+    if '\n' in text:
+        # Многострочные строки — в двойных кавычках с экранированием
+        text = yaml.dump(value, Dumper=Dumper, allow_unicode=True, width=SCALAR_WIDTH,
+                         default_style='"').rstrip('\n')
+    return text
+
+def render_week(week):
+    """Текст одной недели как элемента списка weeks (тот же вид, что у yaml.dump)"""
+    lines = [
+        f"- week_number: {render_scalar(week['week_number'])}",
+        f"  start_date: {render_scalar(week['start_date'])}",
+        "  days:",
+    ]
+    for day_name, day in week['days'].items():
+        lines.append(f"    {day_name}:")
+        lines.append(f"      date: {render_scalar(day['date'])}")
+        lines.append(f"      theme: {render_scalar(day['theme'])}")
+        if not day['slots']:
+            lines.append("      slots: []")
+            continue
+        lines.append("      slots:")
+        for slot in day['slots']:
+            prefix = "      - "
+            for key, value in slot.items():
+                lines.append(f"{prefix}{key}: {render_scalar(value)}")
+                prefix = "        "
+    lines.append('')
+    return '\n'.join(lines)
+
+def write_schedule_stream(out, meta, weeks):
+    """Пишет расписание по одной неделе, не держа весь документ в памяти"""
+    yaml.dump({'meta': meta}, out, Dumper=Dumper, allow_unicode=True, sort_keys=False)
+    out.write('weeks:\n')
+    count = 0
+    for week in weeks:
+        out.write(render_week(week))
+        count += 1
+    return count
+
+def generate(program, start, num_weeks, output_path, owner=None, timezone=None, force=False):
+    """Генерирует расписание в output_path; при проблемах файл не заменяется (кроме force).
+
+    Возвращает (число недель, список проблем).
+    """
+    program_meta = program.get('meta') or {}
+    meta = {
+        'owner': owner or program_meta.get('owner', 'user'),
+        'timezone': timezone or program_meta.get('timezone', 'Europe/Kiev'),
+        'start_date': start.date().isoformat(),
+        'num_weeks': num_weeks,
+        'generated_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+    }
+
+    problems = []
+    tmp_path = output_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as out:
+        written = write_schedule_stream(out, meta, iter_weeks(program, start, num_weeks, problems))
+
+    if problems and not force:
+        os.remove(tmp_path)
+    else:
+        os.replace(tmp_path, output_path)
+    return written, problems
+
+def recorded_progress(path):
+    """Число слотов в существующем расписании со статусом не planned или с заметками.
+
+    Это живой файл программы: перезапись обнулила бы отмеченный прогресс.
+    """
+    if not os.path.exists(path):
+        return 0
+    data = load_yaml(path)
+    if not isinstance(data, dict):
+        return 0
+    count = 0
+    for week in data.get('weeks') or ():
+        for day in (week.get('days') or {}).values():
+            for slot in (day or {}).get('slots') or ():
+                if (slot.get('status') or 'planned') != 'planned' or slot.get('notes'):
+                    count += 1
+    return count
+
+def check(program, start, num_weeks):
+    """Только проверка программы без записи файла"""
+    problems = []
+    for _ in iter_weeks(program, start, num_weeks, problems):
+        pass
+    return problems
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Генерация многонедельного расписания")
+    parser.add_argument('start', nargs='?',
+                        help="дата начала: '16 февраля 2026 года в 8:00' или 2026-02-16 [08:00]")
+    parser.add_argument('-p', '--program', default=PROGRAM_PATH, help="описание программы (YAML)")
+    parser.add_argument('-o', '--output', default=OUTPUT_PATH, help="куда записать расписание")
+    parser.add_argument('-w', '--weeks', type=int, help="число недель (по умолчанию meta.num_weeks программы)")
+    parser.add_argument('--owner', help="владелец расписания")
+    parser.add_argument('--timezone', help="часовой пояс (по умолчанию meta.timezone программы)")
+    parser.add_argument('--check', action='store_true', help="только проверить пересечения и лимиты")
+    parser.add_argument('--force', action='store_true',
+                        help="записать расписание даже при конфликтах или поверх отмеченного прогресса")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    if not os.path.exists(args.program):
+        print(f"❌ Файл {args.program} не найден")
+        return 1
+
+    program = load_yaml(args.program)
+    try:
+        start = parse_start(args.start) if args.start else datetime.combine(date.today(), datetime.min.time())
+    except ValueError as exc:
+        print(f"❌ {exc}")
+        return 1
+    num_weeks = args.weeks or (program.get('meta') or {}).get('num_weeks') or 8
+
+    if args.check:
+        problems = check(program, start, num_weeks)
+        written = 0
+    else:
+        progress = recorded_progress(args.output)
+        if progress and not args.force:
+            print(f"❌ В {args.output} уже отмечен прогресс: {progress} сессий со статусом или заметками")
+            print("   Укажите другой файл через -o или перезапишите с --force")
+            return 1
+        written, problems = generate(program, start, num_weeks, args.output,
+                                     owner=args.owner, timezone=args.timezone, force=args.force)
+
+    for problem in problems:
+        print(f"⚠️  {problem}")
+
+    # --force влияет только на запись файла, результат --check от него не зависит
+    if problems and (args.check or not args.force):
+        print(f"❌ Найдено проблем: {len(problems)}" + ("" if args.check else ", расписание не записано"))
+        return 1
+
+    if args.check:
+        print(f"✅ Программа на {num_weeks} недель без конфликтов")
+    else:
+        if problems:
+            print(f"⚠️  Расписание записано несмотря на {len(problems)} проблем (--force)")
+        print(f"✅ Расписание на {written} недель: {args.output}")
+        print(f"📅 Начало: {start:%Y-%m-%d %H:%M}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
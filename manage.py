@@ -1,6 +1,9 @@
 #!/bin/bash
 # Скрипт для удобного управления системой самосовершенствования
 
+MULTIWEEK_SCHEDULE="schedule/multiweek-schedule.yaml"
+WEEKLY_SCHEDULE="schedule/weekly-schedule.yaml"
+
 show_help() {
     echo "🧠 Управление системой самосовершенствования"
     echo ""
@@ -9,7 +12,8 @@ show_help() {
     echo "Команды:"
     echo "  setup     - Настроить виртуальное окружение и зависимости"
     echo "  generate  - Сгенерировать расписание (нужна дата/время)"
-    echo "  export    - Экспортировать расписание в ICS"
+    echo "  export    - Экспортировать расписание в ICS (сгенерированное multiweek, если оно есть)"
+    echo "  batch     - Пакетный экспорт расписаний многих пользователей в ICS"
     echo "  status    - Проверить статус системы"
     echo "  help      - Показать эту справку"
     echo ""
@@ -17,6 +21,8 @@ show_help() {
     echo "  $0 setup"
     echo "  $0 generate '16 февраля 2026 года в 8:00'"
     echo "  $0 export"
+    echo "  $0 export -i schedule/weekly-schedule.yaml"
+    echo "  $0 batch 'users/*/schedule.yaml' --output-dir calendars/"
 }
 
 setup_venv() {
@@ -49,7 +55,7 @@ generate_schedule() {
     fi
 
     source venv/bin/activate
-    python3 generate_schedule.py "$1"
+    python3 generate_schedule.py "$@"
 }
 
 export_ics() {
@@ -60,13 +66,35 @@ export_ics() {
         exit 1
     fi
 
-    if [ ! -f "schedule/weekly-schedule.yaml" ]; then
-        echo "❌ Сначала сгенерируйте расписание"
+    # generate пишет multiweek-schedule.yaml — его и экспортируем, если вход не указан явно
+    if [ -f "$MULTIWEEK_SCHEDULE" ]; then
+        case " $* " in
+            *" --multiweek "*|*" -i "*|*" --input "*|*" --input="*) ;;
+            *) set -- --multiweek "$@" ;;
+        esac
+    fi
+
+    # Наличие входного файла проверяет сам export_ics.py
+    source venv/bin/activate
+    python3 export_ics.py "$@"
+}
+
+batch_export() {
+    echo "📦 Пакетный экспорт расписаний..."
+
+    if [ ! -d "venv" ]; then
+        echo "❌ Сначала выполните: $0 setup"
+        exit 1
+    fi
+
+    if [ -z "$1" ]; then
+        echo "❌ Укажите каталог или шаблон файлов расписаний"
+        echo "Пример: $0 batch 'users/*/schedule.yaml'"
         exit 1
     fi
 
     source venv/bin/activate
-    python3 export_ics.py
+    python3 batch_export.py "$@"
 }
 
 check_status() {
@@ -80,11 +108,25 @@ check_status() {
         echo "❌ Виртуальное окружение: не настроено"
     fi
 
-    # Проверяем расписание
-    if [ -f "schedule/weekly-schedule.yaml" ]; then
-        echo "✅ Расписание: сгенерировано"
+    # Проверяем расписание: сгенерированное многонедельное, иначе недельное
+    schedule_file="$WEEKLY_SCHEDULE"
+    ics_file="schedule/weekly-schedule.ics"
+    if [ -f "$MULTIWEEK_SCHEDULE" ]; then
+        schedule_file="$MULTIWEEK_SCHEDULE"
+        ics_file="schedule/multiweek-schedule.ics"
+    fi
+
+    if [ -f "$schedule_file" ]; then
+        echo "✅ Расписание: сгенерировано ($schedule_file)"
         # Показываем дату начала
-        start_date=$(grep "start_date:" schedule/weekly-schedule.yaml | cut -d"'" -f2)
+        if [ -d "venv" ]; then
+            source venv/bin/activate
+        fi
+        start_date=$(python3 schedule_query.py -s "$schedule_file" start-date 2>/dev/null)
+        if [ -z "$start_date" ]; then
+            # Без PyYAML/pytz (venv не настроен) — читаем meta.start_date напрямую
+            start_date=$(grep -m1 "start_date:" "$schedule_file" | sed "s/.*start_date:[[:space:]]*//; s/[\"']//g")
+        fi
         if [ ! -z "$start_date" ]; then
             echo "📅 Дата начала: $start_date"
         fi
@@ -93,8 +135,8 @@ check_status() {
     fi
 
     # Проверяем ICS
-    if [ -f "schedule/weekly-schedule.ics" ]; then
-        echo "✅ ICS экспорт: готов"
+    if [ -f "$ics_file" ]; then
+        echo "✅ ICS экспорт: готов ($ics_file)"
     else
         echo "❌ ICS экспорт: не готов"
     fi
@@ -115,10 +157,13 @@ case "$1" in
         setup_venv
         ;;
     generate)
-        generate_schedule "$2"
+        generate_schedule "${@:2}"
         ;;
     export)
-        export_ics
+        export_ics "${@:2}"
+        ;;
+    batch)
+        batch_export "${@:2}"
         ;;
     status)
         check_status
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Замеры по этапам конвейера экспорта и обертка над cProfile
+
+Экспорт принимает необязательный timer=StageTimer(); без него код этапов
+не вызывает perf_counter и работает как обычно.
+"""
+
+import cProfile
+import io
+import pstats
+import time
+from contextlib import contextmanager
+
+class StageTimer:
+    """Суммарное время и число вызовов по именованным этапам"""
+
+    def __init__(self):
+        self.totals = {}
+        self.calls = {}
+        # Время вложенных wrap_iter для каждого активного next() (стек)
+        self._nested = []
+
+    def add(self, name, seconds):
+        self.totals[name] = self.totals.get(name, 0.0) + seconds
+        self.calls[name] = self.calls.get(name, 0) + 1
+
+    @contextmanager
+    def stage(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - started)
+
+    def wrap_iter(self, name, iterable):
+        """Итерирует iterable, относя время каждого next() к этапу name.
+
+        Если iterable сам читает из другого wrap_iter (slot_loop поверх
+        load_schedule), время внутреннего этапа во внешний не входит.
+        """
+        iterator = iter(iterable)
+        perf_counter = time.perf_counter
+        nested = self._nested
+        while True:
+            nested.append(0.0)
+            started = perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                elapsed = perf_counter() - started
+                self.add(name, elapsed - nested.pop())
+                if nested:
+                    nested[-1] += elapsed
+            yield item
+
+    def report(self):
+        """Словарь {этап: {'seconds': ..., 'calls': ...}} для JSON"""
+        return {name: {'seconds': round(self.totals[name], 6), 'calls': self.calls[name]}
+                for name in self.totals}
+
+    def print_report(self):
+        print("\n⏱  Время по этапам:")
+        for name, seconds in sorted(self.totals.items(), key=lambda item: -item[1]):
+            calls = self.calls[name]
+            per_call = seconds / calls * 1e6 if calls else 0.0
+            print(f"   {name:<18} {seconds * 1000:>10.2f} мс  {calls:>8} выз.  {per_call:>8.1f} мкс/выз.")
+
+@contextmanager
+def profiled(output_path=None, top=15):
+    """Запускает cProfile на время блока, сохраняет статистику и печатает топ функций"""
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        if output_path:
+            profiler.dump_stats(output_path)
+            print(f"\n🧪 cProfile сохранен: {output_path} (python3 -m pstats {output_path})")
+        buffer = io.StringIO()
+        pstats.Stats(profiler, stream=buffer).sort_stats('cumulative').print_stats(top)
+        print(buffer.getvalue())
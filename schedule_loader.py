@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Загрузка расписания: libyaml C-парсер и кэш скомпилированных снимков
+
+Разобранный YAML сохраняется в schedule/.cache/<имя>.<вид>.pickle вместе с
+sha256 исходного файла. Повторные запуски читают снимок без парсинга YAML;
+снимок пересобирается только при изменении содержимого файла.
+"""
+
+import hashlib
+import os
+import pickle
+
+import yaml
+from yaml.composer import Composer
+
+try:
+    from yaml import CSafeLoader as FastLoader
+except ImportError:  # PyYAML собран без libyaml
+    from yaml import SafeLoader as FastLoader
+
+CACHE_DIR_NAME = '.cache'
+SNAPSHOT_VERSION = 1
+
+if FastLoader is yaml.SafeLoader:
+    StreamingLoader = yaml.SafeLoader
+else:
+    class StreamingLoader(Composer, FastLoader):
+        """Загрузчик для потокового чтения: события из libyaml, узлы собираются по одному.
+
+        CParser не умеет отдавать отдельные поддеревья, поэтому composer берется
+        из чистого PyYAML — он работает поверх check_event/get_event парсера.
+        """
+
+        def __init__(self, stream):
+            FastLoader.__init__(self, stream)
+            Composer.__init__(self)
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def snapshot_path_for(source_path, kind, ext='pickle'):
+    """Путь к снимку (или другому кэшу, например SQLite индексу) рядом с исходным файлом"""
+    directory, name = os.path.split(os.path.abspath(source_path))
+    return os.path.join(directory, CACHE_DIR_NAME, f"{name}.{kind}.{ext}")
+
+def read_snapshot(snapshot_path, version=SNAPSHOT_VERSION):
+    try:
+        with open(snapshot_path, 'rb') as f:
+            snapshot = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        return None
+    if not isinstance(snapshot, dict) or snapshot.get('version') != version:
+        return None
+    return snapshot
+
+def write_snapshot(snapshot_path, snapshot):
+    os.makedirs(os.path.dirname(snapshot_path), exist_ok=True)
+    tmp_path = f"{snapshot_path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, snapshot_path)
+
+def cached_build(source_path, kind, build, version=SNAPSHOT_VERSION):
+    """Возвращает build(source_path), кэшируя результат по содержимому файла.
+
+    Сначала сверяются mtime и размер (без чтения файла), затем sha256:
+    если файл «тронули», но содержимое не изменилось, снимок переиспользуется.
+    version меняют при смене формата результата build, чтобы старые снимки
+    не подхватывались.
+    """
+    stat = os.stat(source_path)
+    snapshot_path = snapshot_path_for(source_path, kind)
+    snapshot = read_snapshot(snapshot_path, version)
+
+    if snapshot is not None and snapshot['mtime_ns'] == stat.st_mtime_ns and snapshot['size'] == stat.st_size:
+        return snapshot['data']
+
+    sha256 = file_sha256(source_path)
+    if snapshot is not None and snapshot['sha256'] == sha256:
+        data = snapshot['data']
+    else:
+        data = build(source_path)
+
+    try:
+        write_snapshot(snapshot_path, {
+            'version': version,
+            'mtime_ns': stat.st_mtime_ns,
+            'size': stat.st_size,
+            'sha256': sha256,
+            'data': data,
+        })
+    except OSError:
+        # Каталог только для чтения — работаем без кэша
+        pass
+
+    return data
+
+def parse_yaml(path):
+    """Разбирает YAML самым быстрым доступным загрузчиком"""
+    with open(path, 'rb') as f:
+        return yaml.load(f, Loader=FastLoader)
+
+def load_yaml(path, use_cache=True):
+    """Загружает расписание, по возможности из скомпилированного снимка"""
+    if not use_cache:
+        return parse_yaml(path)
+    return cached_build(path, 'snapshot', parse_yaml)
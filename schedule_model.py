@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Типизированная модель расписания: Week -> Day -> Slot
+
+Сырые словари из YAML превращаются в компактные объекты с __slots__ за один
+проход: время слота нормализуется (08:00, '10:00' и 600 из YAML 1.1 дают
+одно и то же), начало и конец сразу считаются как datetime с часовым поясом,
+а повторяющиеся строки (специалист, статус) интернируются.
+"""
+
+import sys
+from datetime import datetime, time, timedelta
+
+import pytz
+
+WEEKDAYS = ('monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday')
+DAYS_MAP = {name: offset for offset, name in enumerate(WEEKDAYS)}
+
+DEFAULT_TIMEZONE = 'Europe/Kiev'
+
+_time_cache = {}
+_date_cache = {}
+
+def parse_time(value):
+    """Приводит время слота к datetime.time (YAML 1.1 читает 10:00 без кавычек как 600)"""
+    cached = _time_cache.get(value)
+    if cached is not None:
+        return cached
+
+    if isinstance(value, time):
+        parsed = value
+    elif isinstance(value, int):
+        parsed = time(value // 60, value % 60)
+    else:
+        hours, minutes = str(value).split(':')
+        parsed = time(int(hours), int(minutes))
+
+    _time_cache[value] = parsed
+    return parsed
+
+def parse_date(value):
+    """Приводит дату к datetime.date (строка 'YYYY-MM-DD' или уже date)"""
+    if not isinstance(value, str):
+        return value
+    cached = _date_cache.get(value)
+    if cached is None:
+        cached = _date_cache[value] = datetime.strptime(value, '%Y-%m-%d').date()
+    return cached
+
+class Slot:
+    """Одна сессия расписания с предвычисленными start/end"""
+
+    __slots__ = ('date', 'time', 'duration', 'specialist', 'topic', 'status',
+                 'notes', 'week_context', 'week', 'theme', 'start', 'end')
+
+    def __init__(self, date, time, duration, specialist, topic, status, notes,
+                 week_context, week, theme, start, end):
+        self.date = date
+        self.time = time
+        self.duration = duration
+        self.specialist = specialist
+        self.topic = topic
+        self.status = status
+        self.notes = notes
+        self.week_context = week_context
+        self.week = week
+        self.theme = theme
+        self.start = start
+        self.end = end
+
+    @property
+    def end_time(self):
+        return self.end.time()
+
+    def as_dict(self):
+        """Поля слота в виде словаря (для хэширования и сериализации)"""
+        return {
+            'date': self.date.isoformat(),
+            'time': self.time.strftime('%H:%M'),
+            'duration': self.duration,
+            'specialist': self.specialist,
+            'topic': self.topic,
+            'status': self.status,
+            'notes': self.notes,
+            'week_context': self.week_context,
+            'week': self.week,
+            'theme': self.theme,
+        }
+
+    def __repr__(self):
+        return f"Slot({self.date} {self.time:%H:%M} {self.specialist})"
+
+class Day:
+    """День недели со списком слотов"""
+
+    __slots__ = ('name', 'date', 'theme', 'slots')
+
+    def __init__(self, name, date, theme, slots):
+        self.name = name
+        self.date = date
+        self.theme = theme
+        self.slots = slots
+
+class Week:
+    """Неделя программы"""
+
+    __slots__ = ('number', 'start_date', 'days')
+
+    def __init__(self, number, start_date, days):
+        self.number = number
+        self.start_date = start_date
+        self.days = days
+
+    def iter_slots(self):
+        for day in self.days:
+            yield from day.slots
+
+class Schedule:
+    """Расписание целиком: meta, часовой пояс и недели"""
+
+    __slots__ = ('meta', 'timezone', 'weeks')
+
+    def __init__(self, meta, timezone, weeks):
+        self.meta = meta
+        self.timezone = timezone
+        self.weeks = weeks
+
+    def iter_slots(self):
+        for week in self.weeks:
+            yield from week.iter_slots()
+
+def resolve_timezone(meta, timezone=None):
+    """Часовой пояс: явно переданный, иначе meta.timezone, иначе DEFAULT_TIMEZONE"""
+    if timezone is None:
+        timezone = (meta or {}).get('timezone') or DEFAULT_TIMEZONE
+    if isinstance(timezone, str):
+        timezone = pytz.timezone(timezone)
+    return timezone
+
+def day_tzinfo(tz, day_date):
+    """tzinfo с фиксированным смещением на весь день или None, если в этот день переход DST.
+
+    pytz.localize дорогой, поэтому вне дней перехода он вызывается один раз
+    на день, а не на каждый слот.
+    """
+    first = tz.localize(datetime.combine(day_date, time.min))
+    last = tz.localize(datetime.combine(day_date, time.max))
+    if first.utcoffset() == last.utcoffset():
+        return first.tzinfo
+    return None
+
+def build_day(day_name, day_data, day_date, week_number, tz):
+    """Строит Day, сразу вычисляя start/end каждого слота в поясе tz"""
+    intern = sys.intern
+    theme = day_data.get('theme', '')
+    fixed_tzinfo = day_tzinfo(tz, day_date)
+    slots = []
+    for raw in day_data.get('slots') or ():
+        slot_time = parse_time(raw['time'])
+        duration = raw['duration']
+        if fixed_tzinfo is not None:
+            start = datetime.combine(day_date, slot_time, fixed_tzinfo)
+        else:
+            start = tz.localize(datetime.combine(day_date, slot_time))
+        slots.append(Slot(
+            day_date, slot_time, duration, intern(raw['specialist']),
+            raw.get('topic', ''), intern(raw.get('status') or 'planned'), raw.get('notes') or '',
+            raw.get('week_context', ''), week_number, theme,
+            start, start + timedelta(minutes=duration),
+        ))
+    return Day(day_name, day_date, theme, slots)
+
+def build_week(raw_week, tz):
+    """Строит Week из элемента списка weeks многонедельного расписания"""
+    week_start = parse_date(raw_week['start_date'])
+    number = raw_week.get('week_number')
+    days = []
+    for day_name, day_data in raw_week['days'].items():
+        if day_data.get('date'):
+            day_date = parse_date(day_data['date'])
+        else:
+            day_date = week_start + timedelta(days=DAYS_MAP[day_name])
+        days.append(build_day(day_name, day_data, day_date, number, tz))
+    return Week(number, week_start, days)
+
+def build_schedule(data, timezone=None):
+    """Строит Schedule из разобранного YAML (многонедельный или недельный формат)"""
+    meta = data.get('meta') or {}
+    tz = resolve_timezone(meta, timezone)
+
+    if 'weeks' in data:
+        weeks = [build_week(raw_week, tz) for raw_week in data['weeks'] or ()]
+    else:
+        # Плоский weekly-schedule.yaml: дни недели на верхнем уровне
+        start_date = parse_date(meta['start_date'])
+        number = meta.get('week_number')
+        days = [
+            build_day(day_name, day_data, start_date + timedelta(days=DAYS_MAP[day_name]), number, tz)
+            for day_name, day_data in data.items() if day_name != 'meta'
+        ]
+        weeks = [Week(number, start_date, days)]
+
+    return Schedule(meta, tz, weeks)
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Быстрые запросы к расписанию: что сегодня, что дальше, сессии специалиста
+
+Расписание разбирается один раз и сохраняется в SQLite индекс
+schedule/.cache/<имя>.index.db: строка на слот и индексы по дате,
+специалисту, статусу и времени начала. Запрос читает только нужные строки,
+поэтому время ответа не растет с длиной программы. Индекс пересобирается
+только если изменилось содержимое исходного YAML.
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+from datetime import datetime, timedelta
+
+from schedule_loader import file_sha256, load_yaml, snapshot_path_for
+from schedule_model import Slot, build_schedule, day_tzinfo, parse_date, parse_time, resolve_timezone
+
+SCHEDULE_PATH = 'schedule/multiweek-schedule.yaml'
+INDEX_VERSION = 3
+
+SCHEMA = '''
+CREATE TABLE source (version INTEGER, mtime_ns INTEGER, size INTEGER, sha256 TEXT, meta TEXT);
+CREATE TABLE slots (
+    position INTEGER PRIMARY KEY,
+    start TEXT NOT NULL,
+    date TEXT NOT NULL,
+    time TEXT NOT NULL,
+    duration INTEGER NOT NULL,
+    specialist TEXT NOT NULL,
+    topic TEXT,
+    status TEXT NOT NULL,
+    notes TEXT,
+    week_context TEXT,
+    week INTEGER,
+    theme TEXT
+);
+CREATE INDEX slots_date ON slots(date, time, specialist);
+CREATE INDEX slots_specialist ON slots(specialist, position);
+CREATE INDEX slots_status ON slots(status, start, position);
+'''
+
+# Поля слота в порядке аргументов Slot (без start/end — они считаются при чтении)
+COLUMNS = 'date, time, duration, specialist, topic, status, notes, week_context, week, theme'
+
+class ScheduleIndex:
+    """Открытый индекс расписания: соединение SQLite, meta и часовой пояс"""
+
+    __slots__ = ('conn', 'meta', 'timezone')
+
+    def __init__(self, conn, meta):
+        self.conn = conn
+        self.meta = meta
+        self.timezone = resolve_timezone(meta)
+
+    def close(self):
+        self.conn.close()
+
+def build_index(schedule_path, index_path, stat, sha256):
+    """Строит индекс в index_path; position — порядок слотов по времени начала"""
+    model = build_schedule(load_yaml(schedule_path))
+    slots = sorted(model.iter_slots(), key=lambda s: s.start)
+
+    conn = sqlite3.connect(index_path)
+    conn.executescript("PRAGMA journal_mode = OFF; PRAGMA synchronous = OFF;" + SCHEMA)
+    conn.executemany(
+        "INSERT INTO slots VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        ((position, f"{s.date.isoformat()} {s.time:%H:%M}", s.date.isoformat(), f"{s.time:%H:%M}",
+          s.duration, s.specialist, s.topic, s.status, s.notes, s.week_context, s.week, s.theme)
+         for position, s in enumerate(slots)))
+    conn.execute("INSERT INTO source VALUES (?, ?, ?, ?, ?)",
+                 (INDEX_VERSION, stat.st_mtime_ns, stat.st_size, sha256,
+                  json.dumps(model.meta, ensure_ascii=False, default=str)))
+    conn.commit()
+    return conn
+
+def read_source(conn):
+    """(version, mtime_ns, size, sha256, meta) индекса или None для битого/чужого файла"""
+    try:
+        return conn.execute("SELECT version, mtime_ns, size, sha256, meta FROM source").fetchone()
+    except sqlite3.Error:
+        return None
+
+def load_index(schedule_path=SCHEDULE_PATH):
+    """Открывает актуальный индекс расписания, пересобирая его при изменении файла.
+
+    Как и schedule_loader.cached_build: сначала сверяются mtime и размер,
+    затем sha256 — если файл «тронули» без изменений, индекс не пересобирается.
+    """
+    stat = os.stat(schedule_path)
+    index_path = snapshot_path_for(schedule_path, 'index', 'db')
+    sha256 = None
+
+    if os.path.exists(index_path):
+        conn = sqlite3.connect(index_path)
+        source = read_source(conn)
+        if source is not None and source[0] == INDEX_VERSION:
+            if (source[1], source[2]) == (stat.st_mtime_ns, stat.st_size):
+                return ScheduleIndex(conn, json.loads(source[4]))
+            sha256 = file_sha256(schedule_path)
+            if source[3] == sha256:
+                try:
+                    with conn:
+                        conn.execute("UPDATE source SET mtime_ns = ?, size = ?", (stat.st_mtime_ns, stat.st_size))
+                except sqlite3.Error:
+                    pass
+                return ScheduleIndex(conn, json.loads(source[4]))
+        conn.close()
+
+    sha256 = sha256 or file_sha256(schedule_path)
+    tmp_path = f"{index_path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(index_path), exist_ok=True)
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        build_index(schedule_path, tmp_path, stat, sha256).close()
+        os.replace(tmp_path, index_path)
+        conn = sqlite3.connect(index_path)
+    except (OSError, sqlite3.Error):
+        # Каталог только для чтения — индекс в памяти на один запуск
+        conn = build_index(schedule_path, ':memory:', stat, sha256)
+    return ScheduleIndex(conn, json.loads(read_source(conn)[4]))
+
+def row_to_slot(row, tz, day_offsets):
+    """Slot из строки индекса; start/end считаются только для прочитанных строк.
+
+    day_offsets — кэш day_tzinfo по датам на время одного запроса.
+    """
+    day, slot_time = parse_date(row[0]), parse_time(row[1])
+    if day not in day_offsets:
+        day_offsets[day] = day_tzinfo(tz, day)
+    fixed_tzinfo = day_offsets[day]
+    if fixed_tzinfo is not None:
+        start = datetime.combine(day, slot_time, fixed_tzinfo)
+    else:
+        start = tz.localize(datetime.combine(day, slot_time))
+    return Slot(day, slot_time, *row[2:], start, start + timedelta(minutes=row[2]))
+
+def fetch_slots(index, where, params=(), order='position', limit=None):
+    sql = f"SELECT {COLUMNS} FROM slots WHERE {where} ORDER BY {order}"
+    if limit:
+        sql += " LIMIT ?"
+        params = (*params, limit)
+    day_offsets = {}
+    return [row_to_slot(row, index.timezone, day_offsets) for row in index.conn.execute(sql, params)]
+
+def schedule_now(index):
+    """Текущий момент в часовом поясе расписания (meta.timezone), а не хоста.
+
+    Так today/next совпадают с календарем, который строит export_ics.
+    """
+    return datetime.now(index.timezone)
+
+def query_today(index, day=None):
+    """Слоты на указанную дату (по умолчанию — сегодня в поясе расписания)"""
+    day = (day or schedule_now(index).date()).isoformat()
+    return fetch_slots(index, "date = ?", (day,))
+
+def query_next(index, moment=None, count=1):
+    """Ближайшие незавершенные слоты, начиная с момента moment.
+
+    moment без tzinfo считается временем в поясе расписания.
+    """
+    if moment is None:
+        moment = schedule_now(index)
+    elif moment.tzinfo is not None:
+        moment = moment.astimezone(index.timezone)
+    return fetch_slots(index, "status = 'planned' AND start >= ?", (moment.strftime('%Y-%m-%d %H:%M'),),
+                       order='start, position', limit=count)
+
+def query_by_specialist(index, specialist, status=None):
+    """Все слоты специалиста, при необходимости с фильтром по статусу"""
+    if status:
+        return fetch_slots(index, "specialist = ? AND status = ?", (specialist, status))
+    return fetch_slots(index, "specialist = ?", (specialist,))
+
+def query_pending(index, status='planned', limit=None):
+    """Слоты с указанным статусом в хронологическом порядке (первые limit)"""
+    return fetch_slots(index, "status = ?", (status,), order='start, position', limit=limit)
+
+def count_status(index, status='planned'):
+    return index.conn.execute("SELECT COUNT(*) FROM slots WHERE status = ?", (status,)).fetchone()[0]
+
+def query_slot(index, day, slot_time, specialist):
+    """Слот по дате 'YYYY-MM-DD', времени 'HH:MM' и специалисту или None"""
+    slots = fetch_slots(index, "date = ? AND time = ? AND specialist = ?", (day, slot_time, specialist),
+                        limit=1)
+    return slots[0] if slots else None
+
+def format_slot(slot, with_date=True):
+    line = f"{slot.time:%H:%M}-{slot.end:%H:%M} {slot.specialist} | {slot.topic} [{slot.status}]"
+    return f"{slot.date.isoformat()} {line}" if with_date else line
+
+def print_slots(slots, with_date=True):
+    if not slots:
+        print("ℹ️  Сессий не найдено")
+        return
+    for number, slot in enumerate(slots, 1):
+        print(f"{number}. {format_slot(slot, with_date)}")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Запросы к расписанию программы")
+    parser.add_argument('-s', '--schedule', default=SCHEDULE_PATH, help="путь к YAML расписанию")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    today = commands.add_parser('today', help="план на день")
+    today.add_argument('--date', help="дата YYYY-MM-DD вместо сегодняшней")
+
+    nxt = commands.add_parser('next', help="следующая запланированная сессия")
+    nxt.add_argument('--at', help="момент 'YYYY-MM-DD HH:MM' в поясе расписания вместо текущего")
+    nxt.add_argument('-n', '--count', type=int, default=1, help="сколько сессий показать")
+
+    by_specialist = commands.add_parser('by-specialist', help="сессии специалиста")
+    by_specialist.add_argument('specialist')
+    by_specialist.add_argument('--status', help="фильтр по статусу (planned, completed, ...)")
+
+    pending = commands.add_parser('pending', help="сессии с указанным статусом")
+    pending.add_argument('--status', default='planned')
+    pending.add_argument('--limit', type=int, help="показать только первые N")
+
+    commands.add_parser('start-date', help="дата начала программы")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    if not os.path.exists(args.schedule):
+        print(f"❌ Файл {args.schedule} не найден")
+        return 1
+
+    index = load_index(args.schedule)
+
+    if args.command == 'today':
+        day = datetime.strptime(args.date, '%Y-%m-%d').date() if args.date else schedule_now(index).date()
+        slots = query_today(index, day)
+        theme = slots[0].theme if slots else ''
+        print(f"📋 План на {day.isoformat()}" + (f" — {theme}" if theme else ''))
+        print_slots(slots, with_date=False)
+    elif args.command == 'next':
+        moment = datetime.strptime(args.at, '%Y-%m-%d %H:%M') if args.at else None
+        print_slots(query_next(index, moment, args.count))
+    elif args.command == 'by-specialist':
+        print_slots(query_by_specialist(index, args.specialist, args.status))
+    elif args.command == 'pending':
+        print(f"📊 {args.status}: {count_status(index, args.status)}")
+        if args.limit != 0:
+            print_slots(query_pending(index, args.status, args.limit))
+    elif args.command == 'start-date':
+        print(index.meta.get('start_date', ''))
+    index.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,386 @@
+#!/usr/bin/env python3
+"""
+Индекс заметок сессий: SQLite FTS5 рядом с markdown в progress/sessions/
+
+Markdown остается источником истины, а progress/notes.db — дополняемый
+индекс: каждая заметка привязывается к слоту расписания (дата, время,
+специалист, неделя) и попадает в полнотекстовый индекс. Еженедельный обзор
+собирается запросом по неделе, без перечитывания всей истории.
+
+Примеры:
+    python3 session_notes.py sync
+    python3 session_notes.py search "дыхание"
+    python3 session_notes.py search --raw "дыхан* NOT стресс"
+    python3 session_notes.py by-specialist meditation-guide
+    python3 session_notes.py review 1
+"""
+
+import argparse
+import os
+import re
+import sqlite3
+import sys
+from datetime import datetime
+
+SESSIONS_DIR = 'progress/sessions'
+PROGRESS_DIR = 'progress'
+DB_PATH = 'progress/notes.db'
+SCHEDULE_PATH = 'schedule/multiweek-schedule.yaml'
+
+# 2026-02-16-08-00-meditation-guide.md
+NOTE_NAME_PATTERN = 'YYYY-MM-DD-HH-MM-specialist.md'
+NOTE_NAME_RE = re.compile(r'^(\d{4}-\d{2}-\d{2})-(\d{2})-(\d{2})-(.+)\.md$')
+# Версия схемы (PRAGMA user_version): 2 — пути заметок относительно каталога заметок
+SCHEMA_VERSION = 2
+
+WEEK_RE = re.compile(r'^\*\*Неделя:\*\*\s*(\d+)', re.MULTILINE)
+SECTION_RE = re.compile(r'^##\s+(.+?)\s*$', re.MULTILINE)
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS notes (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL,
+    date TEXT NOT NULL,
+    time TEXT NOT NULL,
+    specialist TEXT NOT NULL,
+    week INTEGER,
+    topic TEXT,
+    title TEXT,
+    body TEXT NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    superseded INTEGER NOT NULL DEFAULT 0,
+    indexed_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS notes_path ON notes(path, superseded);
+CREATE INDEX IF NOT EXISTS notes_specialist ON notes(specialist, date, time);
+CREATE INDEX IF NOT EXISTS notes_week ON notes(week, date, time);
+CREATE VIRTUAL TABLE IF NOT EXISTS notes_fts USING fts5(
+    title, body, content='notes', content_rowid='id', tokenize='unicode61'
+);
+'''
+
+def connect(db_path=DB_PATH, sessions_dir=SESSIONS_DIR):
+    os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    conn.executescript(SCHEMA)
+    if conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+        migrate_paths(conn, sessions_dir)
+    return conn
+
+def note_key(path, sessions_dir=SESSIONS_DIR):
+    """Ключ заметки в индексе: путь относительно каталога заметок.
+
+    sync и add получают один и тот же ключ, каким бы ни был переданный
+    путь — относительным от корня репозитория или абсолютным.
+    """
+    return os.path.relpath(os.path.abspath(path), os.path.abspath(sessions_dir))
+
+def retire(conn, row):
+    """Помечает запись устаревшей и убирает ее из полнотекстового индекса"""
+    conn.execute("UPDATE notes SET superseded = 1 WHERE id = ?", (row['id'],))
+    conn.execute("INSERT INTO notes_fts(notes_fts, rowid, title, body) VALUES ('delete', ?, ?, ?)",
+                 (row['id'], row['title'], row['body']))
+
+def migrate_paths(conn, sessions_dir=SESSIONS_DIR):
+    """Переводит пути старой схемы (от корня репозитория или абсолютные) в ключи note_key.
+
+    Если одна заметка попала в индекс дважды (через sync и через add с
+    абсолютным путем), актуальной остается последняя запись.
+    """
+    with conn:
+        live = {}
+        rows = conn.execute("SELECT id, path, title, body, superseded FROM notes ORDER BY id").fetchall()
+        for row in rows:
+            key = note_key(row['path'], sessions_dir)
+            conn.execute("UPDATE notes SET path = ? WHERE id = ?", (key, row['id']))
+            if row['superseded']:
+                continue
+            if key in live:
+                retire(conn, live[key])
+            live[key] = row
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+def load_slot_lookup(schedule_path=SCHEDULE_PATH):
+    """Функция (date, time, specialist) -> (week, topic) по индексу расписания"""
+    if not os.path.exists(schedule_path):
+        return lambda note_date, note_time, specialist: (None, None)
+
+    # Импорт здесь, чтобы заметки индексировались и без PyYAML/pytz
+    from schedule_query import load_index, query_slot
+
+    index = load_index(schedule_path)
+    start_date = index.meta.get('start_date')
+    if start_date:
+        start_date = datetime.strptime(str(start_date), '%Y-%m-%d').date()
+
+    def lookup(note_date, note_time, specialist):
+        slot = query_slot(index, note_date, note_time, specialist)
+        if slot is not None:
+            return slot.week, slot.topic
+        if start_date:
+            return (datetime.strptime(note_date, '%Y-%m-%d').date() - start_date).days // 7 + 1, None
+        return None, None
+
+    return lookup
+
+def parse_note(path, text):
+    """Извлекает дату, время, специалиста, неделю и заголовок заметки"""
+    match = NOTE_NAME_RE.match(os.path.basename(path))
+    if not match:
+        return None
+
+    note_date, hours, minutes, specialist = match.groups()
+    title = ''
+    for line in text.splitlines():
+        if line.startswith('# '):
+            title = line[2:].strip()
+            break
+
+    week = WEEK_RE.search(text)
+    return {
+        'date': note_date,
+        'time': f"{hours}:{minutes}",
+        'specialist': specialist,
+        'week': int(week.group(1)) if week else None,
+        'title': title,
+    }
+
+def index_note(conn, path, lookup, stat=None, sessions_dir=SESSIONS_DIR):
+    """Добавляет заметку в индекс; изменившаяся заметка добавляется новой записью.
+
+    Возвращает True, если запись добавлена, и False, если заметка не менялась.
+    ValueError, если имя файла не по шаблону NOTE_NAME_PATTERN.
+    """
+    if not NOTE_NAME_RE.match(os.path.basename(path)):
+        raise ValueError(f"{os.path.basename(path)}: имя заметки должно быть вида {NOTE_NAME_PATTERN}")
+    key = note_key(path, sessions_dir)
+    stat = stat or os.stat(path)
+    current = conn.execute(
+        "SELECT id, title, body, mtime_ns, size FROM notes WHERE path = ? AND superseded = 0",
+        (key,)).fetchone()
+    if current is not None and current['mtime_ns'] == stat.st_mtime_ns and current['size'] == stat.st_size:
+        return False
+
+    with open(path, 'r', encoding='utf-8') as f:
+        text = f.read()
+    note = parse_note(path, text)
+
+    week, topic = lookup(note['date'], note['time'], note['specialist'])
+    if note['week'] is None:
+        note['week'] = week
+
+    if current is not None:
+        retire(conn, current)
+
+    cursor = conn.execute(
+        "INSERT INTO notes (path, date, time, specialist, week, topic, title, body, mtime_ns, size, indexed_at)"
+        " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        (key, note['date'], note['time'], note['specialist'], note['week'], topic, note['title'], text,
+         stat.st_mtime_ns, stat.st_size, datetime.now().isoformat(timespec='seconds')))
+    conn.execute("INSERT INTO notes_fts(rowid, title, body) VALUES (?, ?, ?)",
+                 (cursor.lastrowid, note['title'], text))
+    return True
+
+def sync(conn, sessions_dir=SESSIONS_DIR, schedule_path=SCHEDULE_PATH):
+    """Индексирует новые и изменившиеся заметки и снимает с индекса удаленные.
+
+    Возвращает (добавлено, удалено).
+    """
+    known = {row['path']: row for row in conn.execute(
+        "SELECT id, path, title, body, mtime_ns, size FROM notes WHERE superseded = 0")}
+
+    changed = []
+    with os.scandir(sessions_dir) as entries:
+        for entry in entries:
+            if not NOTE_NAME_RE.match(entry.name):
+                continue
+            key = note_key(entry.path, sessions_dir)
+            stat = entry.stat()
+            row = known.pop(key, None)
+            if row is None or (row['mtime_ns'], row['size']) != (stat.st_mtime_ns, stat.st_size):
+                changed.append((entry.path, stat))
+
+    # Остались записи без файла в каталоге: удаленные заметки (или добавленные через add извне)
+    missing = [row for key, row in known.items()
+               if not os.path.exists(os.path.join(sessions_dir, key))]
+
+    if not changed and not missing:
+        return 0, 0
+
+    lookup = load_slot_lookup(schedule_path) if changed else None
+    added = 0
+    with conn:
+        for row in missing:
+            retire(conn, row)
+        for path, stat in sorted(changed):
+            added += index_note(conn, path, lookup, stat, sessions_dir)
+    return added, len(missing)
+
+def fts_query(text):
+    """Запрос пользователя как FTS5: каждое слово — строка в кавычках, слова через AND.
+
+    Дефисы, двоеточия и кавычки в запросе не разбираются как синтаксис FTS5
+    ("self-care" не превращается в фильтр по колонке care).
+    """
+    return ' '.join('"' + term.replace('"', '""') + '"' for term in text.split())
+
+def search(conn, query, specialist=None, limit=20, raw=False):
+    """Полнотекстовый поиск, лучшие совпадения первыми; raw — запрос в синтаксисе FTS5"""
+    if not raw:
+        query = fts_query(query)
+        if not query:
+            return []
+    sql = ("SELECT notes.*, snippet(notes_fts, 1, '[', ']', '…', 12) AS snippet"
+           " FROM notes_fts JOIN notes ON notes.id = notes_fts.rowid"
+           " WHERE notes_fts MATCH ? AND notes.superseded = 0")
+    params = [query]
+    if specialist:
+        sql += " AND notes.specialist = ?"
+        params.append(specialist)
+    sql += " ORDER BY bm25(notes_fts) LIMIT ?"
+    params.append(limit)
+    return conn.execute(sql, params).fetchall()
+
+def by_specialist(conn, specialist, limit=None):
+    """Заметки специалиста в хронологическом порядке"""
+    sql = ("SELECT * FROM notes WHERE specialist = ? AND superseded = 0"
+           " ORDER BY date, time")
+    params = [specialist]
+    if limit:
+        sql += " LIMIT ?"
+        params.append(limit)
+    return conn.execute(sql, params).fetchall()
+
+def week_notes(conn, week):
+    return conn.execute(
+        "SELECT * FROM notes WHERE week = ? AND superseded = 0 ORDER BY date, time", (week,)).fetchall()
+
+def extract_section(body, name):
+    """Текст раздела '## name' заметки (до следующего '## ')"""
+    matches = list(SECTION_RE.finditer(body))
+    for position, match in enumerate(matches):
+        if match.group(1).lower().startswith(name.lower()):
+            end = matches[position + 1].start() if position + 1 < len(matches) else len(body)
+            return body[match.end():end].strip()
+    return ''
+
+def render_review(week, notes):
+    """Markdown еженедельного обзора по записям индекса"""
+    lines = [f"# Обзор недели {week}", ""]
+    if not notes:
+        lines.append("Заметок за эту неделю нет.")
+        return "\n".join(lines) + "\n"
+
+    specialists = sorted({note['specialist'] for note in notes})
+    lines += [
+        f"**Сессий:** {len(notes)}  ",
+        f"**Период:** {notes[0]['date']} — {notes[-1]['date']}  ",
+        f"**Специалисты:** {', '.join(specialists)}",
+        "",
+    ]
+
+    current_date = None
+    for note in notes:
+        if note['date'] != current_date:
+            current_date = note['date']
+            lines += [f"## {current_date}", ""]
+        title = note['title'] or note['topic'] or ''
+        lines.append(f"### {note['time']} {note['specialist']} — {title}")
+        for section in ('Ключевые инсайты', 'Домашнее задание'):
+            content = extract_section(note['body'], section)
+            if content:
+                lines += ["", f"**{section}:**", content]
+        lines.append("")
+
+    return "\n".join(lines)
+
+def write_review(conn, week, progress_dir=PROGRESS_DIR):
+    """Пишет <progress_dir>/week-N-review.md только по записям недели N"""
+    notes = week_notes(conn, week)
+    os.makedirs(progress_dir, exist_ok=True)
+    path = os.path.join(progress_dir, f"week-{week}-review.md")
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(render_review(week, notes))
+    return path, len(notes)
+
+def print_notes(rows, with_snippet=False):
+    if not rows:
+        print("ℹ️  Заметок не найдено")
+        return
+    for number, row in enumerate(rows, 1):
+        print(f"{number}. {row['date']} {row['time']} {row['specialist']} | {row['title']} ({row['path']})")
+        if with_snippet:
+            print(f"   {' '.join(row['snippet'].split())}")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Индекс заметок сессий")
+    parser.add_argument('--db', default=DB_PATH, help="путь к SQLite базе")
+    parser.add_argument('--sessions', default=SESSIONS_DIR, help="каталог с markdown заметками")
+    parser.add_argument('-s', '--schedule', default=SCHEDULE_PATH, help="расписание для привязки к слотам")
+    parser.add_argument('--progress', help="каталог для обзоров недель (по умолчанию — родитель --sessions)")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    commands.add_parser('sync', help="проиндексировать новые и изменившиеся заметки")
+
+    add = commands.add_parser('add', help="проиндексировать одну заметку")
+    add.add_argument('path')
+
+    found = commands.add_parser('search', help="полнотекстовый поиск")
+    found.add_argument('query')
+    found.add_argument('--raw', action='store_true', help="запрос в синтаксисе FTS5 (NOT, OR, префикс*, ...)")
+    found.add_argument('--specialist')
+    found.add_argument('--limit', type=int, default=20)
+
+    specialist = commands.add_parser('by-specialist', help="заметки специалиста")
+    specialist.add_argument('specialist')
+    specialist.add_argument('--limit', type=int)
+
+    review = commands.add_parser('review', help="собрать progress/week-N-review.md")
+    review.add_argument('week', type=int)
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    conn = connect(args.db, args.sessions)
+    try:
+        if args.command == 'sync':
+            added, removed = sync(conn, args.sessions, args.schedule)
+            print(f"✅ Проиндексировано заметок: {added}, снято с индекса удаленных: {removed}")
+        elif args.command == 'add':
+            if not os.path.exists(args.path):
+                print(f"❌ Файл {args.path} не найден")
+                return 1
+            try:
+                with conn:
+                    added = index_note(conn, args.path, load_slot_lookup(args.schedule), sessions_dir=args.sessions)
+            except ValueError as exc:
+                print(f"❌ {exc}")
+                return 1
+            print("✅ Заметка проиндексирована" if added else "ℹ️  Заметка уже в индексе")
+        elif args.command == 'search':
+            # Заметки, сохраненные после последнего sync, тоже должны находиться
+            sync(conn, args.sessions, args.schedule)
+            print_notes(search(conn, args.query, args.specialist, args.limit, args.raw), with_snippet=True)
+        elif args.command == 'by-specialist':
+            sync(conn, args.sessions, args.schedule)
+            print_notes(by_specialist(conn, args.specialist, args.limit))
+        elif args.command == 'review':
+            sync(conn, args.sessions, args.schedule)
+            progress_dir = args.progress or os.path.dirname(os.path.normpath(args.sessions)) or '.'
+            try:
+                path, count = write_review(conn, args.week, progress_dir)
+            except OSError as exc:
+                print(f"❌ Не удалось записать обзор: {exc}")
+                return 1
+            print(f"✅ Обзор недели {args.week}: {path} ({count} сессий)")
+    except sqlite3.OperationalError as exc:
+        print(f"❌ Ошибка запроса к индексу заметок: {exc}")
+        return 1
+    finally:
+        conn.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())